@@ -0,0 +1,140 @@
+"""
+MEDIA_ROOT/STATIC_ROOT fayllarini berish (django.conf.urls.static o'rniga).
+
+- ETag/Last-Modified va If-None-Match/If-Modified-Since (304), If-Match (412).
+- Range: bitta oraliq uchun 206 Partial Content, noto'g'ri oraliq uchun 416;
+  If-Range mos kelmasa butun fayl beriladi. Bir nechta oraliq so'ralsa ham
+  butun fayl qaytariladi (RFC 9110 ruxsat beradi).
+- Fayl FileResponse bilan oqimda beriladi; WSGI server file_wrapper'i
+  (masalan, gunicorn) os.sendfile ishlatadi, oraliq uchun ham: fayl
+  boshlang'ich joyga o'tkazilgan va Content-Length berilgan bo'ladi.
+- MEDIA_ACCEL_REDIRECT berilsa javob tanasiz X-Accel-Redirect bo'ladi va
+  faylni (Range bilan birga) nginx o'zi uzatadi.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Faylning [start, start + length) qismi; fileno() sendfile uchun ochiq qoladi."""
+
+    def __init__(self, path, start, length):
+        self.file = open(path, 'rb')
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    'bytes=a-b' | 'bytes=a-' | 'bytes=-n' -> (start, end) (end ham kiradi).
+    Sarlavha yo'q yoki bir nechta oraliq bo'lsa None; qondirib bo'lmasa ValueError.
+    """
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def range_applies(request, etag, last_modified):
+    """If-Range bo'lmasa yoki ETag/sana mos kelsa True."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def cache_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve(request, path, document_root, accel_prefix=None):
+    try:
+        full_path = safe_join(document_root, path)
+        info = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404
+
+    # Kuchli validator: hajm va nanosekund aniqlikdagi o'zgartirilgan vaqt
+    etag = quote_etag(f'{info.st_size:x}-{info.st_mtime_ns:x}')
+    last_modified = int(info.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return cache_headers(not_modified, etag, last_modified)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(path.lstrip('/'))
+        return cache_headers(response, etag, last_modified)
+
+    size = info.st_size
+    byte_range = None
+    if range_applies(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return cache_headers(response, etag, last_modified)
+
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, status=206 if byte_range else 200)
+    else:
+        response = FileResponse(RangeFile(full_path, start, length), content_type=content_type, status=206 if byte_range else 200)
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return cache_headers(response, etag, last_modified)
+
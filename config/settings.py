@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 from decouple import config
 from django.utils import timezone
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -8,6 +9,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = config('SECRET_KEY')
 
 DEBUG = config('DEBUG', default=False, cast=bool)
+TESTING = sys.argv[1:2] == ['test']
 
 ALLOWED_HOSTS = ['qqrnatcraft.uz', 'www.qqrnatcraft.uz', '127.0.0.1']
 
@@ -22,7 +24,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
     'channels',
-    # 'django_filters',
+    'django_filters',
     'products',
     'accounts',
     'workshop',
@@ -55,6 +57,62 @@ REST_FRAMEWORK = {
     # ],
 }
 
+# Katalog sahifalash sozlamalari (keyset pagination)
+CATALOG_PAGE_SIZE = config('CATALOG_PAGE_SIZE', default=20, cast=int)
+CATALOG_MAX_PAGE_SIZE = config('CATALOG_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Ko'rishlar hisoblagichi buferi: Redis URL berilmasa jarayon xotirasida saqlanadi
+VIEW_COUNTER_REDIS_URL = config('VIEW_COUNTER_REDIS_URL', default='')
+VIEW_COUNTER_FLUSH_INTERVAL = config('VIEW_COUNTER_FLUSH_INTERVAL', default=10, cast=int)
+# Lokal buferni fon oqimi va atexit bilan yozish; testlarda o'chiq (test bazasi yopilgach haqiqiy bazaga yozmasin)
+VIEW_COUNTER_BACKGROUND_FLUSH = config('VIEW_COUNTER_BACKGROUND_FLUSH', default=not TESTING, cast=bool)
+
+# Foydalanuvchi uchun saqlanadigan oxirgi ko'rilgan mahsulotlar soni
+RECENTLY_VIEWED_LIMIT = config('RECENTLY_VIEWED_LIMIT', default=50, cast=int)
+# Savatchadagi bitta mahsulotning eng ko'p miqdori
+CART_MAX_QUANTITY = config('CART_MAX_QUANTITY', default=999, cast=int)
+
+# Mahsulot rasmlari variantlarini (thumbnail/WebP) yaratuvchi jarayonlar soni
+IMAGE_VARIANT_WORKERS = config('IMAGE_VARIANT_WORKERS', default=2, cast=int)
+
+# Rasm dublikati deb hisoblanadigan eng katta dHash Hamming masofasi (indeks 3 gacha kafolatlaydi)
+IMAGE_DUPLICATE_MAX_DISTANCE = config('IMAGE_DUPLICATE_MAX_DISTANCE', default=3, cast=int)
+
+# Katalog javoblari keshining yashash vaqti (soniya); eskirish avlod
+# hisoblagichlari orqali bo'ladi, TTL faqat eski yozuvlarni tozalaydi
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Har bir mahsulot uchun saqlanadigan tavsiyalar (o'xshash mahsulotlar) soni
+RELATED_PRODUCTS_LIMIT = config('RELATED_PRODUCTS_LIMIT', default=20, cast=int)
+# Matn o'xshashligi (TF-IDF) lug'atidagi eng ko'p uchraydigan so'zlar soni
+CONTENT_SIMILARITY_MAX_FEATURES = config('CONTENT_SIMILARITY_MAX_FEATURES', default=4096, cast=int)
+
+# Trend reytingi: signal og'irligi yarim yemirilish muddati (kun) va hisobga olinadigan oyna (kun)
+TRENDING_HALF_LIFE_DAYS = config('TRENDING_HALF_LIFE_DAYS', default=3, cast=float)
+TRENDING_WINDOW_DAYS = config('TRENDING_WINDOW_DAYS', default=30, cast=int)
+
+# Avtoto'ldirish: natijalar soni va xotiradagi indeksni to'liq qayta qurish oralig'i (soniya)
+AUTOCOMPLETE_LIMIT = config('AUTOCOMPLETE_LIMIT', default=10, cast=int)
+AUTOCOMPLETE_REFRESH_INTERVAL = config('AUTOCOMPLETE_REFRESH_INTERVAL', default=300, cast=int)
+# Indeksni server ishga tushganda fon oqimida qurish (testlarda o'chiq)
+AUTOCOMPLETE_BUILD_ON_STARTUP = config('AUTOCOMPLETE_BUILD_ON_STARTUP', default=not TESTING, cast=bool)
+
+# Bo'laklab (resumable) yuklash: vaqtinchalik fayllar papkasi, fayl va bitta PUT bo'lagining
+# eng katta hajmi (bayt), foydalanuvchining bir vaqtdagi sessiyalari va faolsiz sessiya muddati (soniya)
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default=os.path.join(BASE_DIR, 'upload_sessions'))
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=500 * 1024 * 1024, cast=int)
+UPLOAD_CHUNK_MAX_SIZE = config('UPLOAD_CHUNK_MAX_SIZE', default=16 * 1024 * 1024, cast=int)
+UPLOAD_MAX_ACTIVE_SESSIONS = config('UPLOAD_MAX_ACTIVE_SESSIONS', default=3, cast=int)
+UPLOAD_SESSION_TTL = config('UPLOAD_SESSION_TTL', default=24 * 60 * 60, cast=int)
+
+# Avlod hisoblagichlari barcha workerlar uchun umumiy bo'lishi kerak: standart — CHANNEL_LAYERS ishlatadigan Redis.
+# LocMemCache har bir jarayonda alohida, shuning uchun faqat bitta jarayonli dev/test uchun (CACHE_REDIS_URL='').
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='' if DEBUG or TESTING else 'redis://127.0.0.1:6379/1')
+if CACHE_REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 ASGI_APPLICATION = 'config.asgi.application'
 
 CHANNEL_LAYERS = {
@@ -210,6 +268,10 @@ STATICFILES_DIRS = [
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Media fayllar keshi muddati (soniya) va nginx internal location prefiksi (masalan, /protected-media/);
+# prefiks berilsa fayl X-Accel-Redirect orqali nginx tomonidan uzatiladi
+MEDIA_CACHE_MAX_AGE = config('MEDIA_CACHE_MAX_AGE', default=7 * 24 * 60 * 60, cast=int)
+MEDIA_ACCEL_REDIRECT = config('MEDIA_ACCEL_REDIRECT', default='')
 
 
 # Default primary key field type
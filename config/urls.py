@@ -1,11 +1,14 @@
 from django.contrib import admin
-from django.urls import path, include
+import re
+
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+from config import media
+
 
 
 schema_view = get_schema_view(
@@ -34,5 +37,10 @@ urlpatterns = [
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]  
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)      
\ No newline at end of file
+# Media va static: Range/206, ETag/304, MEDIA_ACCEL_REDIRECT bo'lsa uzatishni nginx bajaradi
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), media.serve,
+            {'document_root': settings.MEDIA_ROOT, 'accel_prefix': settings.MEDIA_ACCEL_REDIRECT}),
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), media.serve,
+            {'document_root': settings.STATIC_ROOT}),
+]      
\ No newline at end of file
@@ -89,7 +89,9 @@ class CraftmanDetailSerializer(serializers.ModelSerializer):
                   'phone_number', 'experience', 'mentees', 'award', 'profession', 'products']
 
     def get_products(self, obj):
-        products = Product.objects.filter(user=obj.user)
+        request = self.context.get('request')
+        user = request.user if request else None
+        products = Product.objects.with_stats(user).filter(user=obj.user)
         return ProductSerializer(products, many=True, context=self.context).data
     
 
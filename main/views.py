@@ -4,6 +4,7 @@ from accounts.models import UserProfile, Profession
 from products.models import Product
 from products.models import Category
 from products.serializers import CategorySerializer
+from products.response_cache import cache_response
 from workshop.models import Workshop
 from .serializers import (
     BannerSerializer, 
@@ -118,6 +119,7 @@ class CraftmanDetailView(views.APIView):
 class CategoryStatsView(views.APIView):
     permission_classes = [IsReadOnly]
 
+    @cache_response(dependencies=(Category,), per_user=False)
     def get(self, request):
         categories = Category.objects.all()
         serializer = CategorySerializer(categories, many=True)
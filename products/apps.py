@@ -1,6 +1,25 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+SERVER_COMMANDS = ('gunicorn', 'uvicorn', 'daphne', 'uwsgi', 'hypercorn')
+
+
+def serving():
+    """WSGI/ASGI server yoki runserver jarayoni; migrate, shell, test va boshqa skriptlar emas."""
+    return sys.argv[1:2] == ['runserver'] or os.path.basename(sys.argv[0]) in SERVER_COMMANDS
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        if settings.AUTOCOMPLETE_BUILD_ON_STARTUP and serving():
+            from . import autocomplete
+
+            # Birinchi so'rov indeks qurilishini kutmasligi uchun
+            autocomplete.rebuild_in_background()
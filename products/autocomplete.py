@@ -0,0 +1,191 @@
+"""
+Mahsulot va kategoriya nomlari uchun xotiradagi prefiks indeksi.
+
+Har bir nomning har bir so'zidan boshlanuvchi qismi ("qizil gilam" ->
+"qizil gilam", "gilam") tartiblangan ro'yxatda saqlanadi va prefiks
+bisect bilan topiladi. Qisqa prefikslar (SHORT_PREFIX belgigacha) juda ko'p
+mos keladi, shuning uchun ularning top natijalari alohida keshlanadi.
+Natijalar ommaboplik (mahsulot uchun ko'rishlar, kategoriya uchun
+mahsulotlar soni) bo'yicha tartiblanadi.
+
+Indeks server jarayoni ishga tushganda fon oqimida quriladi (so'rov faqat
+birinchi qurish hali tugamagan bo'lsa kutadi), shu jarayondagi
+saqlash/o'chirish signallari bilan yangilanadi va boshqa worker'lardagi
+o'zgarishlar uchun har AUTOCOMPLETE_REFRESH_INTERVAL soniyada fon oqimida
+to'liq qayta quriladi — bu vaqtda so'rovlarga mavjud indeks beriladi.
+"""
+import heapq
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+PRODUCT = 'product'
+CATEGORY = 'category'
+SHORT_PREFIX = 2
+MAX_LIMIT = 50
+
+APOSTROPHES = str.maketrans({'‘': "'", '’': "'", 'ʻ': "'", 'ʼ': "'", '`': "'"})
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().translate(APOSTROPHES).split())
+
+
+def word_suffixes(label):
+    words = normalize(label).split(' ')
+    return {' '.join(words[position:]) for position in range(len(words)) if words[position]}
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = []  # (kalit, tur, id) tartiblangan
+        self._items = {}  # (tur, id) -> (nom, og'irlik)
+        self._short_cache = {}
+        self.built_at = None
+
+    def build(self, items):
+        """items: ((tur, id, nom, og'irlik), ...)"""
+        entries, catalog = [], {}
+        for kind, pk, label, weight in items:
+            catalog[(kind, pk)] = (label, weight)
+            entries.extend((key, kind, pk) for key in word_suffixes(label))
+        entries.sort()
+        with self._lock:
+            self._entries, self._items, self._short_cache = entries, catalog, {}
+            self.built_at = time.monotonic()
+
+    def upsert(self, kind, pk, label, weight):
+        with self._lock:
+            self._remove(kind, pk)
+            self._items[(kind, pk)] = (label, weight)
+            for key in word_suffixes(label):
+                self._entries.insert(bisect_left(self._entries, (key, kind, pk)), (key, kind, pk))
+            self._short_cache.clear()
+
+    def remove(self, kind, pk):
+        with self._lock:
+            self._remove(kind, pk)
+            self._short_cache.clear()
+
+    def _remove(self, kind, pk):
+        item = self._items.pop((kind, pk), None)
+        if item is None:
+            return
+        for key in word_suffixes(item[0]):
+            position = bisect_left(self._entries, (key, kind, pk))
+            if position < len(self._entries) and self._entries[position] == (key, kind, pk):
+                del self._entries[position]
+
+    def complete(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_LIMIT)
+        with self._lock:
+            if len(prefix) <= SHORT_PREFIX:
+                if prefix not in self._short_cache:
+                    self._short_cache[prefix] = self._top(prefix, MAX_LIMIT)
+                matches = self._short_cache[prefix]
+            else:
+                matches = self._top(prefix, limit)
+        return [{'type': kind, 'id': pk, 'label': label} for kind, pk, label, _ in matches[:limit]]
+
+    def _top(self, prefix, limit):
+        found = {}
+        position = bisect_left(self._entries, (prefix,))
+        while position < len(self._entries) and self._entries[position][0].startswith(prefix):
+            _, kind, pk = self._entries[position]
+            found[(kind, pk)] = self._items[(kind, pk)]
+            position += 1
+        best = heapq.nlargest(limit, found.items(), key=lambda item: (item[1][1], -len(item[1][0])))
+        return [(kind, pk, label, weight) for (kind, pk), (label, weight) in best]
+
+    def stats(self):
+        """Indeks hajmi va taxminiy xotira sarfi (bayt)."""
+        with self._lock:
+            size = sys.getsizeof(self._entries) + sys.getsizeof(self._items) + sys.getsizeof(self._short_cache)
+            for entry in self._entries:
+                size += sys.getsizeof(entry) + sys.getsizeof(entry[0])
+            for key, (label, _) in self._items.items():
+                size += sys.getsizeof(key) + sys.getsizeof(label)
+            for matches in self._short_cache.values():
+                size += sys.getsizeof(matches) + sum(sys.getsizeof(match) for match in matches)
+            return {
+                'items': len(self._items),
+                'entries': len(self._entries),
+                'cached_prefixes': len(self._short_cache),
+                'memory_bytes': size,
+                'age_seconds': None if self.built_at is None else round(time.monotonic() - self.built_at, 1),
+            }
+
+
+def load_items():
+    Product = apps.get_model('products', 'Product')
+    Category = apps.get_model('products', 'Category')
+    for pk, name, views in Product.objects.values_list('id', 'name', 'view_count').iterator():
+        yield PRODUCT, pk, name, views
+    for pk, name, count in Category.objects.values_list('id', 'name', 'product_count'):
+        yield CATEGORY, pk, name, count
+
+
+_index = AutocompleteIndex()
+_build_lock = threading.Lock()
+
+
+def get_index():
+    built_at = _index.built_at
+    if built_at is None:
+        # Ishga tushishdagi qurish hali tugamagan (yoki o'chirilgan): faqat shu holda so'rov kutadi
+        with _build_lock:
+            if _index.built_at is None:
+                _index.build(load_items())
+    elif time.monotonic() - built_at >= settings.AUTOCOMPLETE_REFRESH_INTERVAL:
+        rebuild_in_background()
+    return _index
+
+
+def rebuild_in_background():
+    """Indeksni fon oqimida qayta quradi; qurish allaqachon ketayotgan bo'lsa hech narsa qilmaydi."""
+    if not _build_lock.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(target=_build_and_release, name='autocomplete-build', daemon=True).start()
+    except Exception:
+        _build_lock.release()
+        raise
+
+
+def _build_and_release():
+    try:
+        _index.build(load_items())
+    except Exception:
+        logger.exception("Avtoto'ldirish indeksini qurib bo'lmadi")
+    finally:
+        _build_lock.release()
+        # Oqimning o'z DB ulanishi
+        connection.close()
+
+
+def index_product(product):
+    # Indeks hali qurilmagan bo'lsa, birinchi so'rovda bazadan to'liq yuklanadi
+    if _index.built_at is not None:
+        _index.upsert(PRODUCT, product.pk, product.name, product.view_count)
+
+
+def index_category(category):
+    if _index.built_at is not None:
+        _index.upsert(CATEGORY, category.pk, category.name, category.product_count)
+
+
+def remove(kind, pk):
+    if _index.built_at is not None:
+        _index.remove(kind, pk)
@@ -0,0 +1,57 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    list/retrieve uchun ETag va Last-Modified sarlavhalari.
+
+    Viewset `get_freshness(request)` ni qaytaradi: (oxirgi_o'zgarish, versiya)
+    yoki obyekt topilmasa None; oxirgi_o'zgarish None bo'lsa faqat ETag
+    beriladi. Bu keshdagi avlodlar yoki arzon updated_at so'rovi bo'lib,
+    serializatsiyadan oldin bajariladi; mijozdagi nusxa eskirmagan bo'lsa
+    serializerlar umuman ishlamaydi va 304 qaytadi.
+    """
+
+    def get_freshness(self, request):
+        raise NotImplementedError
+
+    def get_lookup_value(self):
+        return self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+    def get_etag(self, request, version):
+        # Javob so'rov parametrlari (filtr, cursor) va foydalanuvchiga (is_liked) bog'liq
+        user_id = request.user.pk if request.user.is_authenticated else None
+        key = repr((self.action, version, request.get_full_path(), user_id))
+        return quote_etag(hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def conditional_response(self, request, render):
+        freshness = self.get_freshness(request)
+        if freshness is None:
+            return render()
+        last_modified, version = freshness
+        etag = self.get_etag(request, version)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = render()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Kesh har safar tekshirib olishi kerak (no-cache), foydalanuvchiga xos
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,197 @@
+"""
+Mahsulot ko'rishlar sonini yozishni kechiktirib (write-behind) hisoblash.
+
+Har bir ko'rish Product qatoriga alohida UPDATE qilish o'rniga oshirishlar
+buferda yig'iladi va davriy ravishda bitta ommaviy UPDATE bilan
+`Product.view_count` ga yoziladi.
+
+- VIEW_COUNTER_REDIS_URL berilgan bo'lsa, bufer Redis hash'ida saqlanadi:
+  worker qayta ishga tushsa ham ko'rishlar yo'qolmaydi.
+- Aks holda bufer jarayon xotirasida va fon (daemon) oqimi uni har
+  VIEW_COUNTER_FLUSH_INTERVAL soniyada yozadi — worker bo'sh turgan bo'lsa
+  ham. Jarayon to'satdan o'ldirilsa (SIGKILL) ko'pi bilan shuncha
+  soniyalik ko'rishlar yo'qoladi; odatiy to'xtashda atexit orqali yoziladi.
+  Oqim va atexit faqat ko'rish qayd etgan (server) jarayonda va
+  VIEW_COUNTER_BACKGROUND_FLUSH yoqilgan bo'lsa ishga tushadi.
+
+Flush response_cache avlodlarini oshirmaydi: view_count keshlangan katalog
+javoblariga kirmaydi (jonli qiymat /view/ endpointi va bundle'da), aks
+holda har bir ko'rish barcha keshlarni eskirtirardi.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+class LocalViewBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    def incr(self, product_id, amount=1):
+        with self._lock:
+            value = self._pending.get(product_id, 0) + amount
+            self._pending[product_id] = value
+            return value
+
+    def pending(self, product_id):
+        return self._pending.get(product_id, 0)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            return pending
+
+    def restore(self, deltas):
+        for product_id, amount in deltas.items():
+            self.incr(product_id, amount)
+
+    def flush_due(self, interval):
+        return time.monotonic() - self._last_flush >= interval
+
+
+class RedisViewBuffer:
+    key = 'natcraft:product_views'
+    lock_key = 'natcraft:product_views:flush'
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def incr(self, product_id, amount=1):
+        return self.client.hincrby(self.key, product_id, amount)
+
+    def pending(self, product_id):
+        return int(self.client.hget(self.key, product_id) or 0)
+
+    def drain(self):
+        # HGETALL + DEL bitta tranzaksiyada: oradagi oshirishlar yo'qolmaydi
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(self.key)
+        pipe.delete(self.key)
+        pending, _ = pipe.execute()
+        return {int(product_id): int(amount) for product_id, amount in pending.items()}
+
+    def restore(self, deltas):
+        pipe = self.client.pipeline(transaction=True)
+        for product_id, amount in deltas.items():
+            pipe.hincrby(self.key, product_id, amount)
+        pipe.execute()
+
+    def flush_due(self, interval):
+        # Faqat bitta worker flush qiladi: kalit interval davomida band turadi
+        return bool(self.client.set(self.lock_key, 1, nx=True, ex=max(int(interval), 1)))
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if settings.VIEW_COUNTER_REDIS_URL:
+                    _buffer = RedisViewBuffer(settings.VIEW_COUNTER_REDIS_URL)
+                else:
+                    _buffer = LocalViewBuffer()
+    return _buffer
+
+
+_background_started = False
+
+
+def _start_background_flush():
+    global _background_started
+    if _background_started or not isinstance(_buffer, LocalViewBuffer) or not settings.VIEW_COUNTER_BACKGROUND_FLUSH:
+        return
+    with _buffer_lock:
+        if _background_started:
+            return
+        _background_started = True
+        atexit.register(_flush_at_exit)
+        threading.Thread(
+            target=_flush_periodically, args=(settings.VIEW_COUNTER_FLUSH_INTERVAL,),
+            name='view-counter-flush', daemon=True,
+        ).start()
+
+
+def record_view(product_id):
+    """
+    Ko'rishni buferga yozadi va bu mahsulotning bazaga hali yozilmagan
+    ko'rishlari sonini qaytaradi (shu chaqiruvdan oldin o'qilgan
+    `view_count` ga qo'shish uchun; flush bo'lsa ham qiymat to'g'ri qoladi).
+    """
+    buffer = get_buffer()
+    _start_background_flush()
+    pending = buffer.incr(product_id)
+    if buffer.flush_due(settings.VIEW_COUNTER_FLUSH_INTERVAL):
+        try:
+            flush()
+        except Exception:
+            logger.exception("Ko'rishlar sonini yozishda xato")
+    return pending
+
+
+def pending_views(product_id):
+    return get_buffer().pending(product_id)
+
+
+def flush():
+    """Buferdagi barcha oshirishlarni ommaviy UPDATE bilan yozadi."""
+    buffer = get_buffer()
+    deltas = buffer.drain()
+    if not deltas:
+        return 0
+    try:
+        items = sorted(deltas.items())
+        with transaction.atomic():
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                batch = items[start:start + FLUSH_BATCH_SIZE]
+                increment = Case(
+                    *[When(pk=product_id, then=Value(amount)) for product_id, amount in batch],
+                    default=Value(0),
+                    output_field=PositiveIntegerField(),
+                )
+                Product.objects.filter(pk__in=[product_id for product_id, _ in batch]).update(
+                    view_count=F('view_count') + increment
+                )
+    except Exception:
+        buffer.restore(deltas)
+        raise
+    return sum(deltas.values())
+
+
+def _flush_periodically(interval):
+    # So'rovlar bo'lmasa ham bufer eskirib qolmasligi uchun
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception("Ko'rishlar sonini yozishda xato")
+        finally:
+            # Oqimning o'z DB ulanishi
+            connection.close()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Chiqishda ko'rishlar sonini yozib bo'lmadi")
@@ -0,0 +1,63 @@
+"""
+Katalogni JSONL/CSV ko'rinishida oqim bilan eksport qilish.
+
+Qatorlar model obyektlarisiz, `.values().iterator()` orqali bo'laklab
+o'qiladi va darhol javobga yoziladi, shuning uchun xotira sarfi
+eksport hajmiga bog'liq emas.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+# values() nomi -> eksportdagi ustun nomi
+FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'price': 'price',
+    'discount': 'discount',
+    'effective_price': 'effective_price',
+    'category_id': 'category_id',
+    'category__name': 'category',
+    'address': 'address',
+    'view_count': 'view_count',
+    'user_id': 'user_id',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+
+class Echo:
+    """csv.writer uchun: yozilgan qatorni saqlamasdan qaytaradi."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset):
+    rows = queryset.order_by('id').values(*FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield {column: row[field] for field, column in FIELDS.items()}
+
+
+def stream_jsonl(queryset):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in iter_rows(queryset):
+        yield encoder.encode(row) + '\n'
+
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    # Excel UTF-8 ni to'g'ri tanishi uchun BOM
+    yield '\ufeff' + writer.writerow(FIELDS.values())
+    for row in iter_rows(queryset):
+        yield writer.writerow(row.values())
+
+
+def stream(queryset, fmt):
+    return stream_csv(queryset) if fmt == 'csv' else stream_jsonl(queryset)
@@ -0,0 +1,74 @@
+import django_filters
+from django.db.models import Count, Q
+
+from .models import Product
+
+# Narx oraliqlari (so'm, chegirmadan keyingi narx) — facet hisoblari shu chegaralar bo'yicha
+PRICE_BUCKETS = (0, 100_000, 250_000, 500_000, 1_000_000, 2_500_000)
+
+# Har bir facet o'z filtrisiz hisoblanadi, aks holda tanlangan kategoriya
+# boshqa kategoriyalar sonini nolga tushirib yuboradi
+CATEGORY_FACET_PARAMS = ('category', 'category_name')
+PRICE_FACET_PARAMS = ('min_price', 'max_price')
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class ProductFilter(django_filters.FilterSet):
+    # Chegirma hisobga olingan narx bo'yicha (indekslangan ustun)
+    min_price = django_filters.NumberFilter(field_name='effective_price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='effective_price', lookup_expr='lte')
+    category = NumberInFilter(field_name='category_id', lookup_expr='in')
+    category_name = django_filters.CharFilter(field_name='category__name', lookup_expr='iexact')
+    has_discount = django_filters.BooleanFilter(method='filter_has_discount')
+    min_discount = django_filters.NumberFilter(field_name='discount', lookup_expr='gte')
+    address = django_filters.CharFilter(field_name='address', lookup_expr='icontains')
+
+    class Meta:
+        model = Product
+        fields = ['min_price', 'max_price', 'category', 'category_name', 'has_discount', 'min_discount', 'address']
+
+    def filter_has_discount(self, queryset, name, value):
+        discounted = Q(discount__gt=0)
+        return queryset.filter(discounted) if value else queryset.exclude(discounted)
+
+
+def _filtered(params, queryset, exclude=()):
+    params = params.copy()
+    for key in exclude:
+        params.pop(key, None)
+    return ProductFilter(params, queryset=queryset).qs
+
+
+def facet_counts(params, queryset):
+    """
+    Joriy filtrlar uchun kategoriya va narx oralig'i bo'yicha sonlar.
+    Ikkala facet ham bittadan GROUP BY / shartli COUNT so'rovi bilan olinadi.
+    """
+    categories = (
+        _filtered(params, queryset, exclude=CATEGORY_FACET_PARAMS)
+        .order_by()
+        .values('category_id', 'category__name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'category__name')
+    )
+
+    bounds = list(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:] + (None,)))
+    aggregates = {}
+    for index, (low, high) in enumerate(bounds):
+        condition = Q(effective_price__gte=low) if high is None else Q(effective_price__gte=low, effective_price__lt=high)
+        aggregates[f'bucket_{index}'] = Count('id', filter=condition)
+    price_counts = _filtered(params, queryset, exclude=PRICE_FACET_PARAMS).aggregate(**aggregates)
+
+    return {
+        'categories': [
+            {'id': row['category_id'], 'name': row['category__name'], 'count': row['count']}
+            for row in categories
+        ],
+        'price_buckets': [
+            {'min': low, 'max': high, 'count': price_counts[f'bucket_{index}']}
+            for index, (low, high) in enumerate(bounds)
+        ],
+    }
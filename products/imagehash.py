@@ -0,0 +1,100 @@
+"""
+Mahsulot rasmlari dublikatlarini aniqlash uchun hashlar.
+
+- content_hash: fayl baytlarining sha256'i — aynan bir xil fayl qayta
+  yuklanganda mavjud fayl va uning variantlari qayta ishlatiladi.
+- dHash: 9x8 kulrang nusxada qo'shni piksellar solishtirilgan 64 bit.
+  Qayta siqilgan yoki o'lchami o'zgargan nusxalarning dHash'lari bir necha
+  bitgagina farq qiladi (Hamming masofasi).
+
+Hamming indeksi: 64 bit BANDS ta 16 bitli bo'lakka bo'linib alohida
+indekslangan ustunlarda saqlanadi. Masofa BANDS dan kichik bo'lsa kamida
+bitta bo'lak to'liq mos keladi, shuning uchun nomzodlar indeks bo'yicha
+olinib, aniq masofa Python'da tekshiriladi.
+
+Modul Django modellarini import qilmaydi: `hash_job` thumbnails pulidagi
+"spawn" jarayonlarda ham ishlaydi.
+"""
+import hashlib
+import logging
+
+import numpy as np
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+BANDS = 4
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+CHUNK_SIZE = 64 * 1024
+
+
+def dhash(fp):
+    """Fayl yo'li yoki fayl obyekti uchun 64 bitli dHash (ishorasiz butun son)."""
+    with Image.open(fp) as original:
+        # JPEG'ni to'liq o'lchamda dekodlamaslik uchun
+        original.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        image = ImageOps.exif_transpose(original).convert('L')
+        image = image.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = np.asarray(image, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def content_hash(chunks):
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hamming(a, b):
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def bands(value):
+    return [(value >> (BAND_BITS * position)) & BAND_MASK for position in range(BANDS)]
+
+
+def to_signed(value):
+    # BigIntegerField imzoli 64 bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def hash_fields(digest, value):
+    """ProductImage maydonlari: {'content_hash': ..., 'dhash': ..., 'dhash_band0': ...}"""
+    fields = {'content_hash': digest, 'dhash': None if value is None else to_signed(value)}
+    for position in range(BANDS):
+        fields[f'dhash_band{position}'] = None if value is None else bands(value)[position]
+    return fields
+
+
+def hash_upload(upload):
+    """Yuklangan fayl uchun (sha256, dHash yoki None); fayl boshiga qaytariladi."""
+    upload.seek(0)
+    digest = content_hash(upload.chunks(CHUNK_SIZE) if hasattr(upload, 'chunks') else iter(lambda: upload.read(CHUNK_SIZE), b''))
+    upload.seek(0)
+    try:
+        value = dhash(upload)
+    except Exception:
+        logger.warning("Rasm dHash'ini hisoblab bo'lmadi: %s", getattr(upload, 'name', upload))
+        value = None
+    upload.seek(0)
+    return digest, value
+
+
+def hash_job(job):
+    """Pul uchun: (pk, source_path) -> (pk, sha256, dHash) yoki xato bo'lsa (pk, None, None)."""
+    pk, source_path = job
+    try:
+        with open(source_path, 'rb') as source:
+            digest = content_hash(iter(lambda: source.read(CHUNK_SIZE), b''))
+        return pk, digest, dhash(source_path)
+    except Exception:
+        logger.exception("Rasm hashini hisoblab bo'lmadi: %s", source_path)
+        return pk, None, None
@@ -0,0 +1,212 @@
+"""
+CSV/JSONL fayldan mahsulotlarni ommaviy import qilish.
+
+Fayl qatorma-qator o'qiladi va IMPORT_CHUNK_SIZE tadan bo'laklarda
+tekshiriladi; har bir bo'lak Product va ProductImage uchun bittadan
+bulk_create bilan yoziladi. Xato qatorlar hisobotga tushadi, qolganlari
+import qilinaveradi. Xotira sarfi fayl hajmiga bog'liq emas.
+
+Ustunlar: name, description, price, category (id yoki nom), discount,
+address, images (sotuvchi mahsulotlaridagi mavjud rasm fayllari nomlari;
+CSV'da "|" bilan ajratiladi). Bunday rasmlarning hashlari va tayyor
+variantlari manba yozuvdan ko'chiriladi — fayl qayta ishlanmaydi.
+"""
+import codecs
+import csv
+import json
+from collections import Counter
+
+from django.db import transaction
+
+from . import response_cache, search, thumbnails
+from .models import Category, Product, ProductImage, adjust_category_counts, calculate_effective_price
+from .serializers import ProductImportRowSerializer
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ('csv', 'jsonl')
+ENCODING_ERROR = "Qator UTF-8 kodlashida emas"
+# Import qilingan rasm manba ProductImage'dan oladigan maydonlar
+SOURCE_FIELDS = ('content_hash', 'dhash', 'dhash_band0', 'dhash_band1', 'dhash_band2', 'dhash_band3', 'variants')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename, requested=None):
+    fmt = (requested or '').lower() or filename.rsplit('.', 1)[-1].lower()
+    if fmt in ('ndjson', 'json'):
+        fmt = 'jsonl'
+    if fmt not in FORMATS:
+        raise ImportFormatError("Fayl formati csv yoki jsonl bo‘lishi kerak")
+    return fmt
+
+
+def decoded_lines(binary_file, bad_lines):
+    """
+    Baytli faylni qatorma-qator UTF-8 sifatida o'qiydi. Noto'g'ri baytli
+    qatorlar '\ufffd' bilan almashtirilib beriladi va raqami bad_lines'ga
+    qo'shiladi — butun import to'xtamaydi, faqat shu qator xato bo'ladi.
+    """
+    for line_number, raw in enumerate(binary_file, start=1):
+        if line_number == 1 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        try:
+            yield raw.decode('utf-8')
+        except UnicodeDecodeError:
+            bad_lines.add(line_number)
+            yield raw.decode('utf-8', errors='replace')
+
+
+def iter_rows(binary_file, fmt):
+    """(qator_raqami, dict yoki xato matni) juftliklarini oqim bilan beradi."""
+    bad_lines = set()
+    lines = decoded_lines(binary_file, bad_lines)
+    if fmt == 'csv':
+        yield from _iter_csv_rows(lines, bad_lines)
+    else:
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            if number in bad_lines:
+                yield number, ENCODING_ERROR
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield number, f"JSON xatosi: {exc}"
+                continue
+            yield number, row if isinstance(row, dict) else "Qator JSON obyekt bo‘lishi kerak"
+
+
+def _iter_csv_rows(lines, bad_lines):
+    reader = csv.DictReader(lines)
+    number = 0
+    last_line = 0
+    while True:
+        number += 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            yield number, f"CSV xatosi: {exc}"
+            last_line = reader.line_num
+            continue
+        # Qo'shtirnoq ichidagi yangi qator tufayli bitta yozuv bir nechta fayl qatorini egallashi mumkin
+        broken = any(last_line < line <= reader.line_num for line in bad_lines)
+        bad_lines.difference_update([line for line in bad_lines if line <= reader.line_num])
+        last_line = reader.line_num
+        if broken:
+            yield number, ENCODING_ERROR
+            continue
+        images = row.get('images') or ''
+        row['images'] = [name.strip() for name in images.split('|') if name.strip()]
+        if not row.get('discount'):
+            row['discount'] = None
+        yield number, row
+
+
+class ProductImporter:
+    def __init__(self, user, chunk_size=IMPORT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        categories = Category.objects.values_list('id', 'name')
+        self.context = {
+            'category_ids': {pk for pk, _ in categories},
+            'category_names': {name.lower(): pk for pk, name in categories},
+        }
+
+    def run(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def _add_error(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': errors})
+
+    def _owned_images(self, chunk):
+        """
+        Bo'lakdagi rasm nomlaridan sotuvchining o'z mahsulotlarida bor bo'lganlari
+        (bitta so'rov): {nom: manba rasmning hashlari va variantlari}.
+        """
+        names = {
+            name
+            for _, data in chunk if isinstance(data, dict) and isinstance(data.get('images'), list)
+            for name in data['images'] if isinstance(name, str)
+        }
+        owned = {}
+        if not names:
+            return owned
+        for row in ProductImage.objects.filter(product__user=self.user, image__in=names).values('image', *SOURCE_FIELDS):
+            name = row.pop('image')
+            # Bir faylga bir nechta yozuv bo'lsa, variantlari tayyori olinadi
+            if name not in owned or (row['variants'] and not owned[name]['variants']):
+                owned[name] = row
+        return owned
+
+    def _import_chunk(self, chunk):
+        self.context['owned_images'] = self._owned_images(chunk)
+        valid = []
+        for number, data in chunk:
+            if isinstance(data, str):
+                self._add_error(number, {'non_field_errors': [data]})
+                continue
+            serializer = ProductImportRowSerializer(data=data, context=self.context)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                self._add_error(number, serializer.errors)
+        if not valid:
+            return
+
+        with transaction.atomic():
+            products = Product.objects.bulk_create([
+                Product(
+                    user=self.user,
+                    name=row['name'],
+                    description=row['description'],
+                    price=row['price'],
+                    category_id=row['category'],
+                    discount=row.get('discount'),
+                    # bulk_create save() ni chaqirmaydi
+                    effective_price=calculate_effective_price(row['price'], row.get('discount')),
+                    address=row['address'],
+                )
+                for row in valid
+            ])
+            # Fayl allaqachon bor: hashlar va tayyor variantlar manba rasmdan ko'chiriladi, qayta ishlanmaydi
+            owned = self.context['owned_images']
+            images = ProductImage.objects.bulk_create([
+                ProductImage(product=product, image=name, **owned[name])
+                for product, row in zip(products, valid)
+                for name in row.get('images', [])
+            ])
+            # bulk_create signal yubormaydi: hisoblagich va qidiruv indeksi shu yerda yangilanadi
+            adjust_category_counts(Counter(product.category_id for product in products))
+            search.index_products((product.pk, product.name, product.description) for product in products)
+            response_cache.bump(Product, ProductImage)
+            for image in images:
+                if not image.variants:
+                    thumbnails.schedule_variants(image)
+        self.created += len(products)
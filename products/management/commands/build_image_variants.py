@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from products import response_cache, thumbnails
+from products.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Mavjud mahsulot rasmlari uchun thumbnail/WebP variantlarini parallel yaratadi. "
+        "Har bir partiyadan keyin natija saqlanadi, shuning uchun to'xtatilgan ish "
+        "qayta ishga tushirilganda tayyor rasmlarni o'tkazib yuboradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help="Variantlari borlarini ham qayta yaratish")
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.order_by('id')
+        if not options['force']:
+            queryset = queryset.filter(variants={})
+        total = queryset.count()
+        done = failed = skipped = 0
+        last_id = 0
+
+        with thumbnails.create_executor(options['workers']) as executor:
+            while True:
+                batch = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                jobs = [job for job in map(thumbnails.build_job, batch) if job is not None]
+                # Lokal yo'li yo'q (tashqi storage) rasmlar xato emas: ular o'tkazib yuboriladi
+                skipped += len(batch) - len(jobs)
+                results = dict(executor.map(thumbnails.render_job, jobs))
+
+                updated = []
+                for image in batch:
+                    if image.pk not in results:
+                        continue
+                    rendered = results[image.pk]
+                    if rendered:
+                        image.variants = thumbnails.save_variants(image.pk, rendered, image.image.storage)
+                        updated.append(image)
+                    else:
+                        failed += 1
+                ProductImage.objects.bulk_update(updated, ['variants'])
+                if updated:
+                    # bulk_update signal yubormaydi
+                    response_cache.bump(ProductImage)
+                done += len(updated)
+                self.stdout.write(f"{done + failed + skipped}/{total} (xato: {failed}, o'tkazildi: {skipped})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{done} ta rasm uchun variantlar yaratildi, {failed} ta xato, {skipped} ta lokal fayli yo'q."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from products.recommendations import build_related_products
+
+
+class Command(BaseCommand):
+    help = (
+        "\"Buni ko'rganlar bularni ham ko'rgan\" tavsiyalarini ViewedProduct tarixidan yangilaydi. "
+        "Faqat oxirgi ishga tushirishdan keyingi ko'rishlar hisoblanadi (har kecha ishlatish uchun)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Watermark'ni bekor qilib hammasini qayta hisoblash")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Bir partiyadagi foydalanuvchilar soni")
+
+    def handle(self, *args, **options):
+        users, products = build_related_products(full=options['full'], user_batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{users} ta foydalanuvchi ko'rishlari hisoblandi, {products} ta mahsulot tavsiyalari yangilandi."
+        ))
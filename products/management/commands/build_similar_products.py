@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from products.similarity import build_similar_products
+
+
+class Command(BaseCommand):
+    help = (
+        "Matni o'xshash mahsulotlar (TF-IDF, kosinus) tavsiyalarini quradi. Standart holatda faqat "
+        "oxirgi ishga tushirishdan keyin o'zgargan mahsulotlar mavjud lug'at bo'yicha hisoblanadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Lug'at va barcha vektorlarni qayta qurish")
+
+    def handle(self, *args, **options):
+        vectorized, updated = build_similar_products(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{vectorized} ta mahsulot vektorlandi, {updated} ta mahsulot tavsiyalari yangilandi."
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from products import uploads
+
+
+class Command(BaseCommand):
+    help = "UPLOAD_SESSION_TTL dan beri yangilanmagan yuklash sessiyalarini va ularning vaqtinchalik fayllarini o'chiradi"
+
+    def handle(self, *args, **options):
+        # post_delete signali vaqtinchalik faylni ham o'chiradi
+        deleted, _ = uploads.expired_sessions().delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} ta eski yuklash sessiyasi o‘chirildi."))
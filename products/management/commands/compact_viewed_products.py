@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from products.models import ViewedProduct
+
+
+class Command(BaseCommand):
+    help = "Oxirgi ko'rilgan mahsulotlar ro'yxatini har bir foydalanuvchi uchun N tagacha qisqartiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=settings.RECENTLY_VIEWED_LIMIT)
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        users = (
+            ViewedProduct.objects.values('user')
+            .annotate(total=Count('id'))
+            .filter(total__gt=limit)
+            .values_list('user', flat=True)
+        )
+        deleted = 0
+        for user_id in users.iterator():
+            deleted += ViewedProduct.objects.trim(user_id, limit)
+        self.stdout.write(self.style.SUCCESS(f"{deleted} ta eski yozuv o‘chirildi."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products import counters
+
+
+class Command(BaseCommand):
+    help = "Buferdagi mahsulot ko‘rishlarini Product.view_count ga yozadi (Redis buferi uchun cron orqali)"
+
+    def handle(self, *args, **options):
+        total = counters.flush()
+        self.stdout.write(self.style.SUCCESS(f"{total} ta ko'rish yozildi."))
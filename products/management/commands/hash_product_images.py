@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from products import imagehash, thumbnails
+from products.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Hashi yo'q mahsulot rasmlari (import qilingan yoki eski) uchun sha256 va dHash'ni "
+        "parallel hisoblaydi; --report bilan yaqin dublikatlar sonini ham chiqaradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--report', action='store_true', help="Yaqin dublikatli rasmlar sonini hisoblash")
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.filter(content_hash='').order_by('id')
+        done = failed = 0
+        last_id = 0
+
+        with thumbnails.create_executor(options['workers']) as executor:
+            while True:
+                batch = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                jobs = []
+                for image in batch:
+                    job = thumbnails.build_job(image)
+                    if job is not None:
+                        jobs.append((job[0], job[1]))
+                results = {pk: (digest, value) for pk, digest, value in executor.map(imagehash.hash_job, jobs)}
+
+                updated = []
+                for image in batch:
+                    digest, value = results.get(image.pk, (None, None))
+                    if digest is None:
+                        failed += 1
+                        continue
+                    for field, field_value in imagehash.hash_fields(digest, value).items():
+                        setattr(image, field, field_value)
+                    updated.append(image)
+                ProductImage.objects.bulk_update(updated, list(imagehash.hash_fields('', 0)))
+                done += len(updated)
+                self.stdout.write(f"{done + failed} (xato: {failed})")
+
+        self.stdout.write(self.style.SUCCESS(f"{done} ta rasm hashlandi, {failed} ta xato."))
+
+        if options['report']:
+            duplicates = 0
+            for pk, value in ProductImage.objects.filter(dhash__isnull=False).values_list('id', 'dhash').iterator():
+                matches = ProductImage.objects.exclude(pk=pk).near_duplicates(imagehash.to_unsigned(value))
+                duplicates += bool(matches)
+            self.stdout.write(f"Yaqin dublikati bor rasmlar: {duplicates}")
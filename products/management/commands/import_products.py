@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from products import importers
+
+
+class Command(BaseCommand):
+    help = "CSV yoki JSONL fayldan mahsulotlarni sotuvchi nomidan ommaviy import qiladi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Sotuvchi email manzili")
+        parser.add_argument('--format', choices=importers.FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=importers.IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError("Foydalanuvchi topilmadi")
+        try:
+            fmt = importers.detect_format(options['path'], options['format'])
+        except importers.ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        importer = importers.ProductImporter(user, chunk_size=options['chunk_size'])
+        with open(options['path'], 'rb') as source:
+            report = importer.run(importers.iter_rows(source, fmt))
+
+        for error in report['errors']:
+            self.stderr.write(f"{error['row']}-qator: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} ta mahsulot qo‘shildi, {report['failed']} ta qator xato."
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from products import search
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Mahsulotlar FTS5 qidiruv indeksini qaytadan quradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write(self.style.WARNING("FTS5 faqat SQLite uchun; indeks qurilmadi."))
+            return
+        total = search.rebuild_index(Product.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} ta mahsulot indekslandi."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.models import recount_category_products
+
+
+class Command(BaseCommand):
+    help = "Category.product_count hisoblagichlarini mahsulotlar jadvalidan qayta hisoblaydi"
+
+    def handle(self, *args, **options):
+        updated = recount_category_products()
+        self.stdout.write(self.style.SUCCESS(f"{updated} ta kategoriya qayta hisoblandi."))
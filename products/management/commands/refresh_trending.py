@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = "Trend reytingini (ko'rishlar, like'lar, savat; vaqt bo'yicha so'nuvchi) qayta hisoblaydi"
+
+    def handle(self, *args, **options):
+        count = refresh_trending()
+        self.stdout.write(self.style.SUCCESS(f"{count} ta mahsulot uchun trend bahosi yozildi."))
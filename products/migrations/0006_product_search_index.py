@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from products import search
+
+
+def create_search_index(apps, schema_editor):
+    search.create_index(schema_editor)
+    if schema_editor.connection.vendor == 'sqlite':
+        Product = apps.get_model('products', 'Product')
+        search.rebuild_index(Product.objects.all())
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:50
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def remove_duplicate_views(apps, schema_editor):
+    # Unique cheklovdan oldin har bir (user, product) uchun faqat eng oxirgi ko'rish qoladi
+    ViewedProduct = apps.get_model('products', 'ViewedProduct')
+    newer = ViewedProduct.objects.filter(
+        user=OuterRef('user'), product=OuterRef('product'), id__gt=OuterRef('id')
+    )
+    ViewedProduct.objects.filter(Exists(newer)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='viewedproduct',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(remove_duplicate_views, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='viewedproduct',
+            unique_together={('user', 'product')},
+        ),
+        migrations.AddIndex(
+            model_name='viewedproduct',
+            index=models.Index(fields=['user', '-viewed_at'], name='viewed_user_recent_idx'),
+        ),
+    ]
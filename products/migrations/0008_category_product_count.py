@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_product_counts(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+    counts = Product.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(
+        count=Count('id')
+    ).values('count')
+    Category.objects.update(product_count=Coalesce(Subquery(counts, output_field=models.IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_viewedproduct_recent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_product_counts, migrations.RunPython.noop),
+    ]
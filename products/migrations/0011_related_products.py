@@ -0,0 +1,77 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_conditional_get'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchJobState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('views', "Birga ko'rilgan")], max_length=20)),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='viewedproduct',
+            index=models.Index(fields=['viewed_at'], name='viewed_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='productcooccurrence',
+            name='other',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product'),
+        ),
+        migrations.AddField(
+            model_name='productcooccurrence',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product'),
+        ),
+        migrations.AddField(
+            model_name='relatedproduct',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_products', to='products.product'),
+        ),
+        migrations.AddField(
+            model_name='relatedproduct',
+            name='related',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='products.product'),
+        ),
+        migrations.AddIndex(
+            model_name='productcooccurrence',
+            index=models.Index(fields=['product', '-count'], name='cooccurrence_top_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productcooccurrence',
+            unique_together={('product', 'other')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='relatedproduct',
+            unique_together={('product', 'kind', 'rank')},
+        ),
+    ]
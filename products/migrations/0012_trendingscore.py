@@ -0,0 +1,26 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_related_products'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='products.product')),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score'], name='trending_score_idx'), models.Index(fields=['category', '-score'], name='trending_category_score_idx')],
+            },
+        ),
+    ]
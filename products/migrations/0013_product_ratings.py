@@ -0,0 +1,56 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:03
+
+import products.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q
+
+
+def fill_product_ratings(apps, schema_editor):
+    Comment = apps.get_model('products', 'Comment')
+    Product = apps.get_model('products', 'Product')
+    stats = Comment.objects.order_by().values('product').annotate(
+        count=Count('id'),
+        avg=Avg('rating'),
+        **{f'r{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)},
+    )
+    updates = []
+    for row in stats.iterator():
+        updates.append(Product(
+            pk=row['product'],
+            rating_count=row['count'],
+            rating_avg=round(row['avg'] or 0, 2),
+            rating_histogram=[row[f'r{star}'] for star in range(1, 6)],
+        ))
+    Product.objects.bulk_update(updates, ['rating_count', 'rating_avg', 'rating_histogram'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_trendingscore'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_histogram',
+            field=models.JSONField(default=products.models.empty_rating_histogram, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating_avg', '-id'], name='product_rating_idx'),
+        ),
+        migrations.RunPython(fill_product_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_product_ratings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['product', '-created_at', '-id'], name='comment_product_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['product', '-rating', '-created_at', '-id'], name='comment_product_rating_idx'),
+        ),
+    ]
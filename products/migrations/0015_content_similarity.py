@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_comment_product_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTextVector',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='text_vector', serialize=False, to='products.product')),
+                ('indices', models.JSONField(default=list)),
+                ('weights', models.JSONField(default=list)),
+                ('fingerprint', models.CharField(max_length=40)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='batchjobstate',
+            name='payload',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='relatedproduct',
+            name='kind',
+            field=models.CharField(choices=[('views', "Birga ko'rilgan"), ('content', "Matni o'xshash")], max_length=20),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:08
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_effective_price(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    batch = []
+    for product in Product.objects.only('id', 'price', 'discount').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        discount = min(max(product.discount or Decimal(0), Decimal(0)), Decimal(100))
+        product.effective_price = (product.price * (100 - discount) / 100).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        batch.append(product)
+        if len(batch) >= BATCH_SIZE:
+            Product.objects.bulk_update(batch, ['effective_price'])
+            batch = []
+    Product.objects.bulk_update(batch, ['effective_price'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_content_similarity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=16),
+        ),
+        # Indeks ma'lumotlar to'ldirilgandan keyin quriladi
+        migrations.RunPython(fill_effective_price, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['effective_price', 'id'], name='product_effective_price_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:33
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_viewed_at(apps, schema_editor):
+    # Mavjud yozuvlar uchun birinchi ko'rish vaqti ma'lum emas: oxirgi ko'rish vaqti olinadi
+    ViewedProduct = apps.get_model('products', 'ViewedProduct')
+    ViewedProduct.objects.update(first_viewed_at=F('viewed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0019_uploadsession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='viewedproduct',
+            name='first_viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_viewed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='viewedproduct',
+            index=models.Index(fields=['first_viewed_at'], name='viewed_first_at_idx'),
+        ),
+    ]
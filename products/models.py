@@ -1,13 +1,25 @@
-from django.db import models
+import os
+import uuid
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from . import autocomplete, imagehash, response_cache, search, thumbnails
 # Create your models here.
 class Category(models.Model):
     name = models.CharField(max_length=50, unique=True)
     description = models.TextField(default='No description provided')
     image = models.ImageField(upload_to='category_images/', null=True, blank=True)
+    # Denormallashtirilgan hisoblagich: Product signallari orqali yangilanadi,
+    # farq paydo bo'lsa `recount_category_products` buyrug'i bilan tuzatiladi
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def clean(self):
         self.name = self.name.lower()
@@ -17,6 +29,44 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+RATING_FIELDS = ('rating_avg', 'rating_count', 'rating_histogram')
+# save() yozmaydigan maydonlar: reytingni update_product_ratings(), ko'rishlar sonini counters.flush() F() bilan yangilaydi
+COUNTER_MANAGED_FIELDS = RATING_FIELDS + ('view_count',)
+
+
+def empty_rating_histogram():
+    # 1 dan 5 gacha har bir baho uchun izohlar soni
+    return [0, 0, 0, 0, 0]
+
+
+def calculate_effective_price(price, discount):
+    """Chegirma (foiz) hisobga olingan, xaridor to'laydigan narx."""
+    price = Decimal(price)
+    discount = min(max(Decimal(discount or 0), Decimal(0)), Decimal(100))
+    return (price * (100 - discount) / 100).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_stats(self, user=None):
+        """
+        like_count va is_liked ni har bir mahsulot uchun alohida so'rovsiz,
+        asosiy so'rov ichida hisoblaydi va rasmlarni oldindan yuklaydi.
+        Korrelyatsiyalangan subquery ishlatiladi: GROUP BY butun jadvalni
+        agregatlamaydi, faqat sahifaga tushgan qatorlar uchun hisoblanadi.
+        """
+        like_count = Favorite.objects.filter(product=models.OuterRef('pk')).values('product').annotate(
+            count=models.Count('id')
+        ).values('count')
+        if user is not None and user.is_authenticated:
+            is_liked = models.Exists(Favorite.objects.filter(user=user, product=models.OuterRef('pk')))
+        else:
+            is_liked = models.Value(False, output_field=models.BooleanField())
+        return self.annotate(
+            like_count=Coalesce(models.Subquery(like_count, output_field=models.IntegerField()), 0),
+            is_liked=is_liked,
+        ).prefetch_related('product_images')
+
+
 class Product(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='products')
     name = models.CharField(max_length=100)
@@ -26,22 +76,109 @@ class Product(models.Model):
     threed_model = models.FileField(upload_to='3d_models/', null=True, blank=True)
     discount = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Discount in percent")
     address = models.CharField(max_length=255)
+    # price va discount'dan save() da hisoblanadi; saralash va narx filtri shu ustun bo'yicha
+    effective_price = models.DecimalField(max_digits=16, decimal_places=2, default=0, editable=False)
     view_count = models.PositiveIntegerField(default=0) 
+    # Izohlar reytingi bo'yicha denormallashtirilgan qiymatlar: Comment signallari
+    # orqali update_product_ratings() yangilaydi
+    rating_avg = models.FloatField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_histogram = models.JSONField(default=empty_rating_histogram, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
+    # Rasmlar va like'lar o'zgarishi bu yerga tushmaydi: ular response_cache avlodlari orqali kuzatiladi
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset sahifalash (created_at, id) bo'yicha
+            models.Index(fields=['-created_at', '-id'], name='product_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='product_user_created_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='product_category_created_idx'),
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+            models.Index(fields=['-rating_avg', '-id'], name='product_rating_idx'),
+            models.Index(fields=['effective_price', 'id'], name='product_effective_price_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.effective_price = calculate_effective_price(self.price, self.discount)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'price', 'discount'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'effective_price'}
+        # post_save signallari (kategoriya hisoblagichi, qidiruv indeksi) shu tranzaksiya ichida ishlaydi
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # To'liq save() UPDATE'iga hisoblagich maydonlari kirmaydi: eskirgan nusxa ularni qaytarib yubormasin.
+        # Qator topilmasa (o'chirilgan, nusxa) Django odatdagidek barcha maydonlar bilan INSERT qiladi
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in COUNTER_MANAGED_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
     def upload_to(instance, filename):
         return 'product_images/{filename}'.format(filename=filename)
 
     def __str__(self):
         return self.name
 
+class ProductImageQuerySet(models.QuerySet):
+    def create_from_upload(self, product, upload):
+        """
+        Yuklangan rasmni saqlaydi. Aynan shu fayl (sha256) avval yuklangan
+        bo'lsa yangi nusxa yozilmaydi: mavjud fayl va tayyor variantlari
+        qayta ishlatiladi. Fayllar rasm o'chirilganda o'chirilmaydi, shuning
+        uchun bir faylga bir nechta yozuv ishora qilishi xavfsiz.
+        """
+        digest, value = imagehash.hash_upload(upload)
+        fields = imagehash.hash_fields(digest, value)
+        original = self.filter(content_hash=digest).exclude(image='').only('image', 'variants').first()
+        if original is not None:
+            return self.create(product=product, image=original.image.name, variants=original.variants, **fields)
+        return self.create(product=product, image=upload, **fields)
+
+    def near_duplicates(self, value, max_distance=None):
+        """
+        dHash'i berilgan qiymatdan max_distance bitgacha farq qiladigan rasmlar:
+        [(rasm, masofa), ...] masofa bo'yicha. Nomzodlar bo'lak indekslaridan olinadi.
+        """
+        max_distance = settings.IMAGE_DUPLICATE_MAX_DISTANCE if max_distance is None else max_distance
+        query = models.Q()
+        for position, band in enumerate(imagehash.bands(value)):
+            query |= models.Q(**{f'dhash_band{position}': band})
+        found = []
+        for image in self.filter(query):
+            distance = imagehash.hamming(value, imagehash.to_unsigned(image.dhash))
+            if distance <= max_distance:
+                found.append((image, distance))
+        found.sort(key=lambda item: (item[1], item[0].pk))
+        return found
+
+
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='product_images')
     image = models.ImageField(upload_to='product_images/')
+    # {variant: {format: fayl nomi}}; fon jarayoni rasm yuklangandan keyin to'ldiradi
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Dublikatlar: fayl sha256'i va dHash (imzoli 64 bit) hamda uning Hamming indeksi uchun 16 bitli bo'laklari
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
+    dhash = models.BigIntegerField(null=True, blank=True, editable=False)
+    dhash_band0 = models.PositiveIntegerField(null=True, blank=True, db_index=True, editable=False)
+    dhash_band1 = models.PositiveIntegerField(null=True, blank=True, db_index=True, editable=False)
+    dhash_band2 = models.PositiveIntegerField(null=True, blank=True, db_index=True, editable=False)
+    dhash_band3 = models.PositiveIntegerField(null=True, blank=True, db_index=True, editable=False)
+
+    objects = ProductImageQuerySet.as_manager()
 
     def __str__(self):
         return f"Image for {self.id}"
+
+    @classmethod
+    def store_variants(cls, pk, variants):
+        cls.objects.filter(pk=pk).update(variants=variants)
+        # update() signal yubormaydi
+        response_cache.bump(cls)
     
 
 class Favorite(models.Model):
@@ -52,6 +189,10 @@ class Favorite(models.Model):
 
     class Meta:
         unique_together = ('user', 'product')  # Har bir foydalanuvchi mahsulotni faqat bir marta yoqdirishi mumkin
+        indexes = [
+            # "Sevimlilarim" ro'yxatini keyset sahifalash uchun
+            models.Index(fields=['user', '-created_at', '-id'], name='favorite_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} likes {self.product.name}"
@@ -79,17 +220,330 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Mahsulot izohlarini keyset sahifalash: sort=recent va sort=rating
+            models.Index(fields=['product', '-created_at', '-id'], name='comment_product_recent_idx'),
+            models.Index(fields=['product', '-rating', '-created_at', '-id'], name='comment_product_rating_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user.email} on {self.product.name}"
 
+    # Izoh va mahsulot reytingini qayta hisoblash (post_save/post_delete signallari) bitta tranzaksiyada
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+
+class ViewedProductQuerySet(models.QuerySet):
+    def record(self, user, product):
+        """
+        Foydalanuvchining oxirgi ko'rganlari ro'yxatini yangilaydi: mahsulot
+        allaqachon ro'yxatda bo'lsa faqat vaqti yangilanadi (bitta UPSERT),
+        keyin ro'yxat RECENTLY_VIEWED_LIMIT tagacha qisqartiriladi.
+        first_viewed_at qayta ko'rishda o'zgarmaydi.
+        """
+        now = timezone.now()
+        self.bulk_create(
+            [self.model(user=user, product=product, viewed_at=now, first_viewed_at=now)],
+            update_conflicts=True,
+            unique_fields=['user', 'product'],
+            update_fields=['viewed_at'],
+        )
+        self.trim(user)
+
+    def trim(self, user, limit=None):
+        limit = settings.RECENTLY_VIEWED_LIMIT if limit is None else limit
+        keep = self.filter(user=user).order_by('-viewed_at', '-id').values('id')[:limit]
+        deleted, _ = self.filter(user=user).exclude(id__in=keep).delete()
+        return deleted
+
 
 class ViewedProduct(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='viewed_products')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='viewed_by')
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    viewed_at = models.DateTimeField(default=timezone.now)
+    # Birinchi ko'rish vaqti: tavsiyalar ishi (u, p) juftligini shu vaqt bo'yicha bir marta sanaydi
+    first_viewed_at = models.DateTimeField(default=timezone.now)
+
+    objects = ViewedProductQuerySet.as_manager()
 
     class Meta:
         ordering = ['-viewed_at']
+        unique_together = ('user', 'product')  # Har bir mahsulot ro'yxatda bir marta, oxirgi ko'rish vaqti bilan
+        indexes = [
+            models.Index(fields=['user', '-viewed_at'], name='viewed_user_recent_idx'),
+            models.Index(fields=['viewed_at'], name='viewed_at_idx'),
+            # Tavsiyalar ishi watermark'dan keyingi yangi ko'rishlarni shu indeks bilan topadi
+            models.Index(fields=['first_viewed_at'], name='viewed_first_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} viewed {self.product.name}"
+
+
+class BatchJobState(models.Model):
+    """Fon ishlari holati: inkremental ishlar qayerda to'xtaganini saqlaydi."""
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    # Ishga xos qo'shimcha holat (masalan, TF-IDF lug'ati)
+    payload = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
+
+
+class ProductCooccurrence(models.Model):
+    """Ikki mahsulotni bir foydalanuvchi ko'rgan holatlar soni (har ikki yo'nalishda saqlanadi)."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('product', 'other')
+        indexes = [
+            models.Index(fields=['product', '-count'], name='cooccurrence_top_idx'),
+        ]
+
+
+class RelatedProduct(models.Model):
+    """Har bir mahsulot uchun oldindan hisoblangan eng yaqin K ta mahsulot."""
+    VIEWS = 'views'
+    CONTENT = 'content'
+    KIND_CHOICES = [
+        (VIEWS, "Birga ko'rilgan"),
+        (CONTENT, "Matni o'xshash"),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_products')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_from')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        # (product, kind, rank) indeksi endpointdagi yagona so'rovga xizmat qiladi
+        unique_together = ('product', 'kind', 'rank')
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.kind} #{self.rank})"
+
+
+class ProductTextVector(models.Model):
+    """Mahsulot matnining siyrak TF-IDF vektori (lug'at indekslari va L2-normallangan og'irliklar)."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='text_vector')
+    indices = models.JSONField(default=list)
+    weights = models.JSONField(default=list)
+    # Nom, tavsif va kategoriyadan olingan xesh: matn o'zgarmagan bo'lsa qayta hisoblanmaydi
+    fingerprint = models.CharField(max_length=40)
+
+    def __str__(self):
+        return f"Vector for {self.product_id}"
+
+
+class TrendingScore(models.Model):
+    """Vaqt o'tishi bilan so'nuvchi ommaboplik bahosi; `refresh_trending` buyrug'i qayta hisoblaydi."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='trending')
+    # Kategoriya bo'yicha reyting uchun denormallashtirilgan
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='trending_score_idx'),
+            models.Index(fields=['category', '-score'], name='trending_category_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.score:.2f}"
+
+
+class UploadSession(models.Model):
+    """
+    Katta fayllarni bo'laklab, uzilgan joyidan davom ettirib yuklash sessiyasi.
+    Qabul qilingan baytlar UPLOAD_SESSION_DIR dagi vaqtinchalik faylda turadi,
+    yakunlanganda mahsulot maydoniga biriktiriladi.
+    """
+    THREED_MODEL = 'threed_model'
+    FIELD_CHOICES = [
+        (THREED_MODEL, '3D model'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='upload_sessions')
+    field = models.CharField(max_length=30, choices=FIELD_CHOICES, default=THREED_MODEL)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    # Shu joygacha baytlar diskka yozilgan; keyingi bo'lak aynan shu joydan boshlanishi kerak
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='upload_session_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.UPLOAD_SESSION_DIR, f'{self.pk}.part')
+
+
+# Qidiruv indeksini (FTS5) mahsulot bilan sinxron saqlash
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_search(sender, instance, **kwargs):
+    search.remove_product(instance.pk)
+
+
+def adjust_category_counts(deltas):
+    """deltas: {category_id: o'zgarish}; har bir kategoriya uchun bitta UPDATE."""
+    for category_id, delta in deltas.items():
+        if category_id is not None and delta:
+            Category.objects.filter(pk=category_id).update(
+                product_count=models.F('product_count') + delta, updated_at=timezone.now()
+            )
+    response_cache.bump(Category)
+
+
+def recount_category_products():
+    """Barcha hisoblagichlarni bitta UPDATE bilan haqiqiy qiymatga keltiradi."""
+    counts = Product.objects.filter(category=models.OuterRef('pk')).order_by().values('category').annotate(
+        count=models.Count('id')
+    ).values('count')
+    updated = Category.objects.update(
+        product_count=Coalesce(models.Subquery(counts, output_field=models.IntegerField()), 0),
+        updated_at=timezone.now(),
+    )
+    response_cache.bump(Category)
+    return updated
+
+
+@receiver(post_init, sender=Product)
+def remember_product_category(sender, instance, **kwargs):
+    # __dict__ orqali: kechiktirilgan (deferred) maydon uchun qo'shimcha so'rov bo'lmasin
+    instance._original_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Product)
+def update_category_count_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust_category_counts({instance.category_id: 1})
+    elif instance._original_category_id != instance.category_id and instance._original_category_id is not None:
+        adjust_category_counts({instance._original_category_id: -1, instance.category_id: 1})
+    instance._original_category_id = instance.category_id
+
+
+@receiver(post_delete, sender=Product)
+def update_category_count_on_delete(sender, instance, **kwargs):
+    adjust_category_counts({instance.category_id: -1})
+
+
+@receiver(post_save, sender=ProductImage)
+def generate_image_variants(sender, instance, created, raw=False, **kwargs):
+    if not raw and not instance.variants:
+        thumbnails.schedule_variants(instance)
+
+
+def update_product_ratings(product_id):
+    """Mahsulot reytingini izohlaridan qayta hisoblaydi (qator qulflangan holda)."""
+    with transaction.atomic():
+        # Parallel izohlar bir-birining natijasini eskirgan qiymat bilan yozib yubormasin
+        if not Product.objects.select_for_update().filter(pk=product_id).exists():
+            return
+        stats = Comment.objects.filter(product_id=product_id).aggregate(
+            count=models.Count('id'),
+            avg=models.Avg('rating'),
+            **{f'r{star}': models.Count('id', filter=models.Q(rating=star)) for star in range(1, 6)},
+        )
+        Product.objects.filter(pk=product_id).update(
+            rating_count=stats['count'],
+            rating_avg=round(stats['avg'] or 0, 2),
+            rating_histogram=[stats[f'r{star}'] for star in range(1, 6)],
+            updated_at=timezone.now(),
+        )
+    response_cache.bump(Product)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_product(sender, instance, **kwargs):
+    instance._original_product_id = instance.__dict__.get('product_id')
+
+
+@receiver(post_save, sender=Comment)
+def update_ratings_on_comment_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_product_ratings(instance.product_id)
+    if instance._original_product_id not in (None, instance.product_id):
+        update_product_ratings(instance._original_product_id)
+    instance._original_product_id = instance.product_id
+
+
+@receiver(post_delete, sender=Comment)
+def update_ratings_on_comment_delete(sender, instance, origin=None, **kwargs):
+    # Mahsulotning o'zi o'chirilayotgan bo'lsa (cascade) qayta hisoblash shart emas
+    if getattr(origin, 'model', type(origin)) is Product:
+        return
+    update_product_ratings(instance.product_id)
+
+
+# Avtoto'ldirish indeksi (jarayon xotirasida) commit'dan keyin yangilanadi
+@receiver(post_save, sender=Product)
+def update_product_autocomplete(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: autocomplete.index_product(instance))
+
+
+@receiver(post_save, sender=Category)
+def update_category_autocomplete(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: autocomplete.index_category(instance))
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    kind = autocomplete.PRODUCT if sender is Product else autocomplete.CATEGORY
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.remove(kind, pk))
+
+
+@receiver(post_delete, sender=UploadSession)
+def remove_upload_session_file(sender, instance, **kwargs):
+    # Yakunlangan sessiyada fayl allaqachon media papkasiga ko'chirilgan bo'ladi
+    try:
+        os.remove(instance.temp_path)
+    except FileNotFoundError:
+        pass
+
+
+# Javob keshi: o'zgargan model avlodi oshiriladi, bog'liq javoblar eskiradi
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_catalog_cache(sender, **kwargs):
+    response_cache.bump(sender)
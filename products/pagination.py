@@ -0,0 +1,177 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class StandardPagination(PageNumberPagination):
+    page_size = 10  # Har bir sahifada 10 ta mahsulot
+    page_size_query_param = 'page_size'  # Foydalanuvchi sahifa hajmini o‘zgartirishi mumkin
+    max_page_size = settings.CATALOG_MAX_PAGE_SIZE
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Butun tartiblash kaliti bo'yicha keyset (seek) sahifalash.
+
+    DRF ning CursorPagination'i faqat birinchi maydon bo'yicha pozitsiya saqlab,
+    qolganini OFFSET bilan yechadi. Bu yerda cursor oxirgi yozuvning barcha
+    tartiblash maydonlari qiymatini saqlaydi, shuning uchun chuqur sahifalar ham
+    birinchi sahifa kabi bitta indeksli so'rov bilan olinadi va yangi yozuvlar
+    qo'shilganda sahifalar siljimaydi. Tartiblash oxirida har doim `id` bo'lishi
+    kerak (yagona kalit bo'lishi uchun) va maydonlar NULL bo'lmasligi kerak.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = settings.CATALOG_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.CATALOG_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        # Tartib yagona bo'lishi uchun oxiriga id qo'shamiz
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[-1].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor['reverse'])
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            values = self.to_python_values(queryset.model, self.cursor['values'])
+            queryset = queryset.filter(self._seek_filter(ordering, values))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def first_page(self, queryset, base_url):
+        """
+        So'rov parametrlariga qaramay standart tartibdagi birinchi sahifa;
+        boshqa javob ichiga joylashtirish uchun, next havolasi base_url'ga quriladi.
+        """
+        self.base_url = base_url
+        self.cursor = None
+        results = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.has_previous = False
+        self.page = results[:self.page_size]
+        return self.page
+
+    def _seek_filter(self, ordering, values):
+        """(a, b, c) > (va, vb, vc) shartini ORM Q ifodasiga aylantiradi."""
+        clauses = []
+        for index, order in enumerate(ordering):
+            field_name = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') else 'gt'
+            equal = {ordering[i].lstrip('-'): values[i] for i in range(index)}
+            clauses.append(Q(**equal, **{f'{field_name}__{lookup}': values[index]}))
+        return reduce(lambda left, right: left | right, clauses)
+
+    def _get_keyset_from_instance(self, instance):
+        values = []
+        for order in self.ordering:
+            field_name = order.lstrip('-')
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return self.encode_cursor({'values': self.cursor['values'], 'reverse': False})
+        return self.encode_cursor({'values': self._get_keyset_from_instance(self.page[-1]), 'reverse': False})
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor({'values': self.cursor['values'], 'reverse': True})
+        return self.encode_cursor({'values': self._get_keyset_from_instance(self.page[0]), 'reverse': True})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            return {'values': list(payload['v']), 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        payload = {'v': cursor['values']}
+        if cursor['reverse']:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def to_python_values(self, model, values):
+        """Cursor qiymatlarini maydon turiga o'giradi, noto'g'ri cursor bo'lsa 404."""
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        converted = []
+        for order, value in zip(self.ordering, values):
+            try:
+                field = model._meta.get_field(order.lstrip('-'))
+                converted.append(field.to_python(value))
+            except FieldDoesNotExist:
+                converted.append(value)
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+        return converted
+
+
+class ProductCursorPagination(KeysetPagination):
+    """Mahsulotlar ro'yxati uchun: eng yangilari birinchi, (created_at, id) bo'yicha."""
+    ordering = ('-created_at', '-id')
+
+
+class FavoriteCursorPagination(KeysetPagination):
+    """Foydalanuvchi sevimlilari: oxirgi yoqtirilganlari birinchi."""
+    ordering = ('-created_at', '-id')
+
+
+class CommentCursorPagination(KeysetPagination):
+    """Mahsulot izohlari: ?sort=recent (standart) yoki ?sort=rating."""
+    ordering = ('-created_at', '-id')
+    sort_query_param = 'sort'
+    sort_orderings = {
+        'recent': ('-created_at', '-id'),
+        'rating': ('-rating', '-created_at', '-id'),
+    }
+
+    def get_ordering(self, request, queryset, view):
+        return self.sort_orderings.get(request.query_params.get(self.sort_query_param), self.ordering)
+
+
+def _reverse_ordering(ordering):
+    return tuple(order[1:] if order.startswith('-') else '-' + order for order in ordering)
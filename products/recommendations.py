@@ -0,0 +1,155 @@
+"""
+"Buni ko'rganlar bularni ham ko'rgan" tavsiyalari.
+
+ViewedProduct tarixidan mahsulot-mahsulot birga ko'rilish (co-occurrence)
+matritsasi siyrak ko'rinishda (ProductCooccurrence) yig'iladi va har bir
+mahsulot uchun eng yaqin K ta qo'shni RelatedProduct jadvaliga yoziladi.
+
+Ish inkremental: faqat oxirgi watermark'dan keyin birinchi marta
+ko'rilganlar hisoblanadi. Har bir yangi ko'rish (u, p) foydalanuvchining
+o'zidan oldin ko'rgan har bir q mahsuloti bilan (p, q) va (q, p)
+juftliklariga 1 qo'shadi; shuning uchun bir partiyadagi ikki yangi ko'rish
+juftligi ikki marta sanalmaydi. Qayta ko'rish faqat viewed_at'ni
+yangilaydi, first_viewed_at o'zgarmaydi — inkremental natija to'liq qayta
+qurish bilan bir xil bo'ladi. Juftliklar NumPy bilan vektorlashtirilgan holda sanaladi.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from . import response_cache
+from .models import BatchJobState, ProductCooccurrence, RelatedProduct, ViewedProduct
+
+JOB_NAME = 'related_products.views'
+USER_BATCH_SIZE = 1000
+PRODUCT_BATCH_SIZE = 500
+# Kechikib commit bo'lgan ko'rishlar o'tkazib yuborilmasligi uchun eng yangi daqiqa keyingi ishga qoladi
+WATERMARK_LAG = timedelta(minutes=1)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _micros(value):
+    # float timestamp() mikrosekundlarni yo'qotishi mumkin: aniq butun son
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def cooccurrence_pairs(users, products, times, watermark):
+    """
+    Bir xil uzunlikdagi massivlar (foydalanuvchi, mahsulot, vaqt) bo'yicha
+    yangi ko'rishlar hosil qilgan yo'naltirilgan juftliklarni sanaydi.
+    Natija: (product, other, count) massivlari.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if not len(users):
+        return empty, empty, empty
+    # Foydalanuvchi, keyin vaqt (teng vaqtda mahsulot id) bo'yicha tartiblash
+    order = np.lexsort((products, times, users))
+    users, products, times = users[order], products[order], times[order]
+    positions = np.arange(len(users))
+    group_start = np.maximum.accumulate(np.where(np.r_[True, users[1:] != users[:-1]], positions, 0))
+
+    # Yangi ko'rish o'z guruhidagi oldingi barcha ko'rishlar bilan juftlashadi
+    pair_counts = np.where(times > watermark, positions - group_start, 0)
+    total = int(pair_counts.sum())
+    if not total:
+        return empty, empty, empty
+    later = np.repeat(positions, pair_counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    earlier = np.repeat(group_start, pair_counts) + offsets
+
+    source = np.concatenate([products[later], products[earlier]])
+    target = np.concatenate([products[earlier], products[later]])
+    pairs, counts = np.unique(np.stack([source, target], axis=1), axis=0, return_counts=True)
+    return pairs[:, 0], pairs[:, 1], counts
+
+
+def add_cooccurrences(product_ids, other_ids, counts):
+    """Mavjud sonlarga qo'shib yozadi (bitta UPSERT so'rovi, SQLite va PostgreSQL'da bir xil)."""
+    table = connection.ops.quote_name(ProductCooccurrence._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} (product_id, other_id, count) VALUES (%s, %s, %s) "
+        f"ON CONFLICT (product_id, other_id) DO UPDATE SET count = {table}.count + excluded.count"
+    )
+    rows = [(int(p), int(o), int(c)) for p, o, c in zip(product_ids, other_ids, counts)]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def store_related(kind, neighbours):
+    """
+    neighbours: {product_id: [(related_id, score), ...]} (kamayish tartibida).
+    Berilgan mahsulotlarning shu turdagi ro'yxatlari to'liq almashtiriladi.
+    """
+    product_ids = sorted(neighbours)
+    for start in range(0, len(product_ids), PRODUCT_BATCH_SIZE):
+        chunk = product_ids[start:start + PRODUCT_BATCH_SIZE]
+        with transaction.atomic():
+            RelatedProduct.objects.filter(product_id__in=chunk, kind=kind).delete()
+            RelatedProduct.objects.bulk_create([
+                RelatedProduct(product_id=product_id, related_id=related_id, kind=kind, score=score, rank=rank)
+                for product_id in chunk
+                for rank, (related_id, score) in enumerate(neighbours[product_id], start=1)
+            ])
+
+
+def refresh_related(product_ids, limit=None):
+    """Berilgan mahsulotlar uchun top-K qo'shnilarni co-occurrence jadvalidan qayta yozadi."""
+    limit = limit or settings.RELATED_PRODUCTS_LIMIT
+    product_ids = sorted(product_ids)
+    for start in range(0, len(product_ids), PRODUCT_BATCH_SIZE):
+        chunk = product_ids[start:start + PRODUCT_BATCH_SIZE]
+        top = ProductCooccurrence.objects.filter(product_id__in=chunk).annotate(
+            position=Window(RowNumber(), partition_by=F('product_id'), order_by=[F('count').desc(), F('other_id')])
+        ).filter(position__lte=limit).order_by('product_id', 'position').values_list('product_id', 'other_id', 'count')
+        neighbours = {product_id: [] for product_id in chunk}
+        for product_id, other_id, count in top:
+            neighbours[product_id].append((other_id, count))
+        store_related(RelatedProduct.VIEWS, neighbours)
+
+
+def build_related_products(full=False, user_batch_size=USER_BATCH_SIZE):
+    """
+    Watermark'dan keyingi ko'rishlarni hisoblab, ta'sirlangan mahsulotlar
+    tavsiyalarini yangilaydi. full=True bo'lsa hammasi noldan quriladi.
+    Qaytaradi: (qayta ishlangan foydalanuvchilar, yangilangan mahsulotlar).
+    """
+    cutoff = timezone.now() - WATERMARK_LAG
+    touched = set()
+    with transaction.atomic():
+        state, _ = BatchJobState.objects.select_for_update().get_or_create(name=JOB_NAME)
+        if full:
+            ProductCooccurrence.objects.all().delete()
+            state.watermark = None
+        watermark = state.watermark
+
+        new_views = ViewedProduct.objects.filter(first_viewed_at__lte=cutoff)
+        if watermark is not None:
+            new_views = new_views.filter(first_viewed_at__gt=watermark)
+        user_ids = sorted(new_views.order_by().values_list('user_id', flat=True).distinct())
+        watermark_us = _micros(watermark) if watermark else np.iinfo(np.int64).min
+
+        for start in range(0, len(user_ids), user_batch_size):
+            rows = list(ViewedProduct.objects.filter(
+                user_id__in=user_ids[start:start + user_batch_size], first_viewed_at__lte=cutoff
+            ).order_by().values_list('user_id', 'product_id', 'first_viewed_at'))
+            users = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            products = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+            times = np.fromiter((_micros(row[2]) for row in rows), dtype=np.int64, count=len(rows))
+            product_ids, other_ids, counts = cooccurrence_pairs(users, products, times, watermark_us)
+            add_cooccurrences(product_ids, other_ids, counts)
+            touched.update(product_ids.tolist())
+
+        if full:
+            RelatedProduct.objects.filter(kind=RelatedProduct.VIEWS).delete()
+        refresh_related(touched)
+        # Sonlar, ro'yxatlar va watermark bitta tranzaksiyada: ish yarmida to'xtasa hech narsa yozilmaydi
+        # va keyingi ishga tushirish shu ko'rishlarni qayta oladi; to'liq qayta qurishda ham endpoint bo'sh qolmaydi
+        state.watermark = cutoff
+        state.save()
+        response_cache.bump(RelatedProduct)
+    return len(user_ids), len(touched)
@@ -0,0 +1,230 @@
+"""
+Katalog o'qish endpointlari uchun versiyalangan javob keshi.
+
+Har bir model uchun keshda "avlod" (generation) hisoblagichi saqlanadi;
+model post_save/post_delete signallarida (va ommaviy UPDATE'lardan keyin)
+hisoblagich oshiriladi. Kesh kaliti endpoint, to'liq URL (query
+parametrlari bilan), til, kerak bo'lsa foydalanuvchi va bog'liq
+modellarning joriy avlodlaridan tuziladi. Kesh barcha workerlar uchun
+umumiy (Redis) bo'lsa eskirgan yozuvlar qaytarilmaydi: ular shunchaki TTL
+bilan o'chib ketadi. LocMemCache'da har bir jarayon o'z avlodlarini
+ko'radi, shuning uchun u faqat bitta jarayonli dev/test uchun.
+
+Javobda `X-Cache: HIT|MISS|BYPASS` sarlavhasi bo'ladi. Staff foydalanuvchi
+(yoki DEBUG rejimida har kim) `X-Cache-Bypass: 1` yuborsa kesh chetlab
+o'tiladi.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import translation
+from rest_framework.response import Response
+
+GENERATION_PREFIX = 'catalog:gen:'
+RESPONSE_PREFIX = 'catalog:resp:'
+METRICS_PREFIX = 'catalog:metrics:'
+BYPASS_HEADER = 'X-Cache-Bypass'
+
+ENDPOINT_SLOT_PREFIX = 'catalog:endpoints:'
+
+# Shu jarayon umumiy ro'yxatga yozib bo'lgan endpointlar (har so'rovda keshga murojaat qilmaslik uchun)
+_registered = set()
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def bump(*models):
+    """Modellar avlodini oshiradi: ularga bog'liq barcha javoblar eskiradi."""
+    _bump(models)
+    # Commit'gacha eski ma'lumot yangi avlod bilan keshlanib qolmasligi uchun
+    # commit'dan keyin yana bir marta oshiriladi
+    transaction.on_commit(lambda: _bump(models))
+
+
+def _bump(models):
+    for model in models:
+        key = GENERATION_PREFIX + _label(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Kalit yo'q (yoki o'chib ketgan): vaqtga asoslangan boshlang'ich qiymat
+            # eski avlod raqamlari bilan to'qnashmaydi
+            cache.set(key, time.time_ns(), None)
+
+
+def generations(labels):
+    keys = [GENERATION_PREFIX + label for label in labels]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, time.time_ns(), None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def dependency_version(dependencies):
+    """((label, avlod), ...) — bog'liq modellardan biri o'zgarsa (o'chirilsa ham) boshqacha bo'ladi."""
+    labels = sorted(_label(model) for model in dependencies)
+    return tuple(zip(labels, generations(labels)))
+
+
+def build_key(request, endpoint, dependencies, per_user):
+    user_id = None
+    if per_user and request.user.is_authenticated:
+        user_id = request.user.pk
+    parts = (
+        endpoint,
+        request.build_absolute_uri(),
+        translation.get_language(),
+        user_id,
+        dependency_version(dependencies),
+    )
+    return RESPONSE_PREFIX + hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _register(endpoint):
+    """
+    Endpointni umumiy keshdagi ro'yxatga yozadi: har bir nom alohida raqamli
+    slotda, bo'sh slot cache.add (atomar) bilan egallanadi — bir nechta worker
+    bir vaqtda yozsa ham nomlar yo'qolmaydi.
+    """
+    slot = 0
+    while True:
+        key = f'{ENDPOINT_SLOT_PREFIX}{slot}'
+        if cache.add(key, endpoint, None) or cache.get(key) == endpoint:
+            break
+        slot += 1
+    _registered.add(endpoint)
+
+
+def registered_endpoints():
+    endpoints = []
+    slot = 0
+    while True:
+        keys = [f'{ENDPOINT_SLOT_PREFIX}{index}' for index in range(slot, slot + 50)]
+        values = cache.get_many(keys)
+        endpoints.extend(values[key] for key in keys if key in values)
+        if len(values) < len(keys):
+            return sorted(set(endpoints))
+        slot += len(keys)
+
+
+def _count(endpoint, outcome):
+    key = f'{METRICS_PREFIX}{endpoint}:{outcome}'
+    if cache.add(key, 1, None):
+        # Yangi hisoblagich: kesh tozalangan bo'lishi mumkin, endpoint qayta yoziladi
+        _register(endpoint)
+        return
+    if endpoint not in _registered:
+        _register(endpoint)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def metrics():
+    """{endpoint: {'hit': n, 'miss': n, 'bypass': n, 'hit_ratio': x}} — barcha workerlar bo'yicha"""
+    outcomes = ('hit', 'miss', 'bypass')
+    endpoints = registered_endpoints()
+    keys = [f'{METRICS_PREFIX}{endpoint}:{outcome}' for endpoint in endpoints for outcome in outcomes]
+    values = cache.get_many(keys)
+    result = {}
+    for endpoint in endpoints:
+        counts = {outcome: values.get(f'{METRICS_PREFIX}{endpoint}:{outcome}', 0) for outcome in outcomes}
+        served = counts['hit'] + counts['miss']
+        counts['hit_ratio'] = round(counts['hit'] / served, 4) if served else None
+        result[endpoint] = counts
+    return result
+
+
+def wants_bypass(request):
+    if request.headers.get(BYPASS_HEADER) != '1':
+        return False
+    return settings.DEBUG or request.user.is_staff
+
+
+def cached_response(view, request, render, dependencies, per_user=False):
+    endpoint = f'{type(view).__name__}.{getattr(view, "action", None) or request.method.lower()}'
+    if wants_bypass(request):
+        _count(endpoint, 'bypass')
+        response = render()
+        response['X-Cache'] = 'BYPASS'
+        return response
+
+    key = build_key(request, endpoint, dependencies, per_user)
+    cached = cache.get(key)
+    if cached is not None:
+        _count(endpoint, 'hit')
+        response = Response(cached)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count(endpoint, 'miss')
+    response = render()
+    if isinstance(response, Response) and response.status_code == 200:
+        cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def versioned(endpoint, version, build):
+    """
+    Obyekt versiyasiga bog'langan ma'lumotni keshlaydi: versiya o'zgarsa kalit
+    ham o'zgaradi. Qaytaradi: (ma'lumot, keshdan olinganmi).
+    """
+    key = RESPONSE_PREFIX + hashlib.sha1(repr((endpoint, translation.get_language(), version)).encode('utf-8')).hexdigest()
+    data = cache.get(key)
+    if data is not None:
+        _count(endpoint, 'hit')
+        return data, True
+    _count(endpoint, 'miss')
+    data = build()
+    cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+    return data, False
+
+
+def cache_response(dependencies=None, per_user=None):
+    """
+    View metodi (get yoki action) uchun dekorator; berilmagan parametrlar
+    view'ning `cache_dependencies`/`cache_per_user` atributlaridan olinadi.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            return cached_response(
+                self, request, lambda: method(self, request, *args, **kwargs),
+                self.cache_dependencies if dependencies is None else dependencies,
+                self.cache_per_user if per_user is None else per_user,
+            )
+        return wrapper
+    return decorator
+
+
+class CachedResponseMixin:
+    """
+    Viewset list/retrieve javoblarini keshlaydi.
+
+    `cache_dependencies` — javob bog'liq bo'lgan modellar (label yoki klass),
+    `cache_per_user` — javobda foydalanuvchiga xos maydonlar bo'lsa (is_liked).
+    """
+    cache_dependencies = ()
+    cache_per_user = False
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            self, request, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+            self.cache_dependencies, self.cache_per_user,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            self, request, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+            self.cache_dependencies, self.cache_per_user,
+        )
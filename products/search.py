@@ -0,0 +1,187 @@
+"""
+Mahsulotlar bo'yicha to'liq matnli qidiruv.
+
+SQLite'da `products_product_fts` FTS5 virtual jadvali mahsulot nomi va
+tavsifining "soya" indeksi bo'lib xizmat qiladi (rowid = Product.id).
+Indeks Product signallari orqali sinxron saqlanadi va
+`rebuild_search_index` buyrug'i bilan qaytadan quriladi. Boshqa ma'lumotlar
+bazalarida oddiy `icontains` qidiruviga qaytiladi.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+
+FTS_TABLE = 'products_product_fts'
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+# FTS5 ga vaqtinchalik belgilar beriladi: matn avval escape qilinadi, keyin
+# belgilar <mark> ga almashtiriladi (foydalanuvchi matnidagi HTML xavfsiz qoladi)
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+SNIPPET_TOKENS = 16
+# bm25 og'irliklari: nomdagi moslik tavsifdagidan muhimroq
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+SearchHit = namedtuple('SearchHit', ['id', 'rank', 'name', 'snippet'])
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def create_index(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, description, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_index(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def index_products(rows):
+    """rows: (id, name, description) kortejlari."""
+    if not is_available():
+        return
+    rows = list(rows)
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)', rows
+        )
+
+
+def index_product(product):
+    index_products([(product.pk, product.name, product.description)])
+
+
+def remove_product(product_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [product_id])
+
+
+def rebuild_index(queryset, batch_size=2000):
+    """Indeksni to'liq qayta quradi; indekslangan mahsulotlar sonini qaytaradi."""
+    if not is_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    total = 0
+    batch = []
+    for row in queryset.values_list('id', 'name', 'description').iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _insert(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        _insert(batch)
+        total += len(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def _insert(rows):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)', rows
+        )
+
+
+def build_match_query(text):
+    """
+    Foydalanuvchi matnini FTS5 MATCH ifodasiga aylantiradi: har bir so'z
+    qo'shtirnoq ichida (maxsus belgilar sintaksis xatosi bermasligi uchun)
+    va prefiks (*) sifatida, so'zlar orasida AND.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_products(text, queryset):
+    """Sahifalanadigan natijalar obyektini qaytaradi (count() va kesish)."""
+    if is_available():
+        return FTSResults(build_match_query(text))
+    return LikeResults(text, queryset)
+
+
+class FTSResults:
+    """bm25 bo'yicha saralangan natijalar; faqat so'ralgan sahifa o'qiladi."""
+
+    def __init__(self, match):
+        self.match = match
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [self.match])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError('FTSResults faqat kesishni (slice) qo‘llab-quvvatlaydi')
+        if not self.match:
+            return []
+        offset = item.start or 0
+        limit = (item.stop - offset) if item.stop is not None else -1
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({FTS_TABLE}, %s, %s) AS rank, '
+                f'highlight({FTS_TABLE}, 0, %s, %s), '
+                f"snippet({FTS_TABLE}, 1, %s, %s, '…', %s) "
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                [
+                    NAME_WEIGHT, DESCRIPTION_WEIGHT,
+                    _MARK_START, _MARK_END,
+                    _MARK_START, _MARK_END, SNIPPET_TOKENS,
+                    self.match, limit, offset,
+                ],
+            )
+            return [
+                SearchHit(pk, rank, _render_highlight(name), _render_highlight(snippet))
+                for pk, rank, name, snippet in cursor.fetchall()
+            ]
+
+
+class LikeResults:
+    """FTS5 bo'lmagan ma'lumotlar bazalari uchun oddiy qidiruv."""
+
+    def __init__(self, text, queryset):
+        self.queryset = queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        ).order_by('-created_at', '-id')
+
+    def count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        rows = self.queryset.values_list('id', 'name', 'description')[item]
+        return [SearchHit(pk, None, escape(name), escape(description[:200])) for pk, name, description in rows]
+
+
+def _render_highlight(text):
+    return escape(text).replace(_MARK_START, HIGHLIGHT_START).replace(_MARK_END, HIGHLIGHT_END)
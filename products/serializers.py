@@ -1,18 +1,37 @@
+import os
+from decimal import Decimal
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import Product, Category, ProductImage, CartItem, Favorite, Comment, ViewedProduct
+from .models import Product, Category, ProductImage, CartItem, Favorite, Comment, ViewedProduct, UploadSession
 
 
 class CategorySerializer(serializers.ModelSerializer):
     # products = ProductSerializer(many=True, read_only=True)
-    product_count = serializers.IntegerField(source='products.count', read_only=True)
+    product_count = serializers.IntegerField(read_only=True)
     class Meta:
         model = Category
         fields = "__all__"
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = "__all__"
+        # Dublikat hashlari ichki maydonlar, API'da ko'rsatilmaydi
+        exclude = ['content_hash', 'dhash', 'dhash_band0', 'dhash_band1', 'dhash_band2', 'dhash_band3']
+
+    def get_variants(self, obj):
+        """{'thumb': {'jpeg': url, 'webp': url}, 'medium': {...}} — hali tayyor bo'lmasa bo'sh."""
+        request = self.context.get('request')
+        storage = obj.image.storage
+        variants = {}
+        for variant, formats in obj.variants.items():
+            variants[variant] = {}
+            for fmt, name in formats.items():
+                url = storage.url(name)
+                variants[variant][fmt] = request.build_absolute_uri(url) if request else url
+        return variants
 
 class ProductSerializer(serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
@@ -22,14 +41,24 @@ class ProductSerializer(serializers.ModelSerializer):
     )
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     is_liked = serializers.SerializerMethodField()
-    like_count = serializers.IntegerField(source='favorited_by.count', read_only=True)
+    like_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = "__all__"
+        # view_count keshlangan javoblarga kirmaydi: u har ko'rishda o'zgaradi (jonli qiymat /view/ va bundle'da)
+        exclude = ['view_count']
         read_only_fields = ['user', 'created_at', 'updated_at']
 
+    # Product.objects.with_stats() annotatsiyalari mavjud bo'lsa ular o'qiladi,
+    # aks holda (masalan, yangi yaratilgan obyekt) alohida so'rov bajariladi.
+    def get_like_count(self, obj):
+        if hasattr(obj, 'like_count'):
+            return obj.like_count
+        return obj.favorited_by.count()
+
     def get_is_liked(self, obj):
+        if hasattr(obj, 'is_liked'):
+            return obj.is_liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Favorite.objects.filter(user=request.user, product=obj).exists()
@@ -40,10 +69,43 @@ class ProductSerializer(serializers.ModelSerializer):
         product = Product.objects.create( **validated_data)
         if images_data:
             for image_data in images_data:
-                ProductImage.objects.create(product=product, image=image_data)
+                ProductImage.objects.create_from_upload(product, image_data)
         return product
 
 
+class ProductImportRowSerializer(serializers.Serializer):
+    """Ommaviy import qatori: category id yoki nom, images — sotuvchining mavjud rasmlari"""
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField()
+    price = serializers.DecimalField(max_digits=16, decimal_places=2, min_value=Decimal('0'))
+    category = serializers.CharField()
+    discount = serializers.DecimalField(
+        max_digits=5, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('100'), required=False, allow_null=True
+    )
+    address = serializers.CharField(max_length=255)
+    images = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+
+    def validate_category(self, value):
+        # Kategoriyalar importer tomonidan bir marta yuklanib, context orqali beriladi
+        value = value.strip()
+        if value.isdigit() and int(value) in self.context['category_ids']:
+            return int(value)
+        category_id = self.context['category_names'].get(value.lower())
+        if category_id is None:
+            raise serializers.ValidationError("Kategoriya topilmadi.")
+        return category_id
+
+    def validate_images(self, value):
+        for name in value:
+            if not name.startswith('product_images/') or '..' in name.split('/'):
+                raise serializers.ValidationError("Rasm product_images/ papkasidagi fayl bo‘lishi kerak.")
+        # Faqat shu sotuvchi avval yuklagan (o'z mahsulotlaridagi) rasmlar; importer ularni bo'lak uchun bir marta oladi
+        for name in value:
+            if name not in self.context['owned_images']:
+                raise serializers.ValidationError(f"Rasm topilmadi: {name}")
+        return value
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     product = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -53,12 +115,80 @@ class FavoriteSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'product', 'created_at']
         read_only_fields = ['user', 'product', 'created_at']
 
+
+class FavoriteProductSerializer(serializers.ModelSerializer):
+    """Sevimlilar ro'yxati: mahsulot with_stats() bilan oldindan yuklanadi"""
+    product = ProductSerializer(read_only=True)
+
+    class Meta:
+        model = Favorite
+        fields = ['id', 'product', 'created_at']
+
+
+class FavoriteBatchSerializer(serializers.Serializer):
+    like = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+    unlike = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=500)
+
+    def validate(self, attrs):
+        if not attrs['like'] and not attrs['unlike']:
+            raise serializers.ValidationError("like yoki unlike ro‘yxati bo‘sh bo‘lmasligi kerak.")
+        if set(attrs['like']) & set(attrs['unlike']):
+            raise serializers.ValidationError("Bir mahsulot ham like, ham unlike ro‘yxatida bo‘lishi mumkin emas.")
+        return attrs
+
+    def validate_like(self, value):
+        found = set(Product.objects.filter(pk__in=value).values_list('id', flat=True))
+        missing = sorted(set(value) - found)
+        if missing:
+            raise serializers.ValidationError(f"Mahsulot topilmadi: {', '.join(map(str, missing))}")
+        return sorted(found)
+
+
 class CartItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartItem
         fields = ['id', 'user', 'product', 'quantity', 'added_at']
 
 
+class CartProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'price', 'discount', 'effective_price']
+
+
+class CartLineSerializer(serializers.ModelSerializer):
+    """Savatcha qatori: mahsulot select_related bilan birga yuklanadi"""
+    product = CartProductSerializer(read_only=True)
+    line_total = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CartItem
+        fields = ['id', 'product', 'quantity', 'added_at', 'line_total']
+
+    def get_line_total(self, obj):
+        return str(obj.product.effective_price * obj.quantity)
+
+
+class CartUpdateItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField(min_value=1)
+    # 0 — mahsulotni savatchadan olib tashlash
+    quantity = serializers.IntegerField(min_value=0, max_value=settings.CART_MAX_QUANTITY)
+
+
+class CartUpdateSerializer(serializers.Serializer):
+    items = CartUpdateItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        product_ids = [item['product'] for item in items]
+        if len(product_ids) != len(set(product_ids)):
+            raise serializers.ValidationError("Bir mahsulot faqat bir marta ko‘rsatilishi kerak.")
+        found = set(Product.objects.filter(pk__in=product_ids).values_list('id', flat=True))
+        missing = sorted(set(product_ids) - found)
+        if missing:
+            raise serializers.ValidationError(f"Mahsulot topilmadi: {', '.join(map(str, missing))}")
+        return items
+
+
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -75,10 +205,88 @@ class CommentSerializer(serializers.ModelSerializer):
         user = request.user
         comment = Comment.objects.create(user=user, **validated_data)
         return comment
+
+
+class ProductCommentSerializer(CommentSerializer):
+    """Mahsulot sahifasidagi izohlar: muallif ma'lumotlari bilan (user__profile oldindan yuklanadi)"""
+    author = serializers.SerializerMethodField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['author']
+
+    def get_author(self, obj):
+        user = obj.user
+        profile = getattr(user, 'profile', None)
+        image = profile.profile_image if profile is not None else None
+        request = self.context.get('request')
+        return {
+            'id': user.pk,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'profile_image': (request.build_absolute_uri(image.url) if request else image.url) if image else None,
+        }
     
 
+class SellerCardSerializer(serializers.Serializer):
+    """Sotuvchi kartasi: foydalanuvchi, profil va ustaxona qisqacha (user__profile, user__workshop oldindan yuklanadi)"""
+
+    def to_representation(self, user):
+        profile = getattr(user, 'profile', None)
+        workshop = getattr(user, 'workshop', None)
+        return {
+            'id': user.pk,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'is_verified': user.is_verified,
+            'profile': None if profile is None else {
+                'profile_image': self._url(profile.profile_image),
+                'bio': profile.bio,
+                'address': profile.address,
+                'experience': profile.experience,
+                'award': profile.award,
+            },
+            'workshop': None if workshop is None else {
+                'id': workshop.pk,
+                'name': workshop.name,
+                'img': self._url(workshop.img),
+                'address': workshop.address,
+            },
+        }
+
+    def _url(self, image):
+        if not image:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(image.url) if request else image.url
+
+
 class ViewedProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = ViewedProduct
         fields = ['id', 'user', 'product', 'viewed_at']
         read_only_fields = ['user', 'viewed_at']
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'product', 'field', 'filename', 'size', 'offset', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'created_at', 'updated_at']
+
+    def validate_product(self, product):
+        if product.user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError("Faqat o‘z mahsulotingizga fayl yuklashingiz mumkin.")
+        return product
+
+    def validate_filename(self, value):
+        name = os.path.basename(value.replace('\\', '/')).strip()
+        if not name or name in ('.', '..'):
+            raise serializers.ValidationError("Fayl nomi noto‘g‘ri.")
+        return name
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Fayl hajmi 1 dan {settings.UPLOAD_MAX_SIZE} baytgacha bo‘lishi kerak.")
+        return value
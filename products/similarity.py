@@ -0,0 +1,266 @@
+"""
+Matni o'xshash mahsulotlar (TF-IDF + kosinus o'xshashlik).
+
+Ko'rish tarixi yo'q yangi mahsulotlar uchun ham tavsiya beradi. Nom (2x
+og'irlik), tavsif va kategoriyadan TF-IDF vektor quriladi; lug'at va IDF
+to'liq qayta qurishda (--full) hisoblanib BatchJobState.payload'da
+saqlanadi. Siyrak vektorlar ProductTextVector jadvalida turadi.
+
+Kosinus top-K bloklarga bo'lingan matritsa ko'paytmalari bilan
+hisoblanadi: xotirada bir vaqtda faqat ikki zich blok
+(BLOCK_SIZE x lug'at hajmi) bo'ladi, butun N x N matritsa hech qachon
+qurilmaydi.
+
+Inkremental rejimda faqat watermark'dan keyin o'zgargan (va matni
+haqiqatan o'zgargan) mahsulotlar mavjud lug'at bo'yicha vektorlanadi;
+ularning ro'yxati to'liq qayta hisoblanadi, boshqa mahsulotlar
+ro'yxatiga esa o'zgargan mahsulotlar birlashtiriladi. Lug'at eskirib
+borgani uchun vaqti-vaqti bilan --full ishga tushirish kerak.
+"""
+import hashlib
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import response_cache
+from .models import BatchJobState, Product, ProductTextVector, RelatedProduct
+from .recommendations import store_related
+
+JOB_NAME = 'related_products.content'
+BLOCK_SIZE = 512
+WRITE_BATCH_SIZE = 1000
+NAME_WEIGHT = 2
+
+TOKEN_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*")
+# O'zbekcha tutuq belgisining turli yozilishlari bitta belgiga keltiriladi
+APOSTROPHES = str.maketrans({'‘': "'", '’': "'", 'ʻ': "'", 'ʼ': "'", '`': "'"})
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower().translate(APOSTROPHES)) if len(token) > 1]
+
+
+def document_terms(name, description, category_id, category_name):
+    terms = Counter(tokenize(description))
+    for token in tokenize(name):
+        terms[token] += NAME_WEIGHT
+    for token in tokenize(category_name):
+        terms[token] += 1
+    # Bir kategoriyadagi mahsulotlar nomi farq qilsa ham bir-biriga yaqinlashadi
+    terms[f'category:{category_id}'] += NAME_WEIGHT
+    return terms
+
+
+def fingerprint(name, description, category_id, category_name):
+    return hashlib.sha1(repr((name, description, category_id, category_name)).encode('utf-8')).hexdigest()
+
+
+class Vocabulary:
+    def __init__(self, terms, idf):
+        self.terms = list(terms)
+        self.index = {term: position for position, term in enumerate(self.terms)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.terms)
+
+    @classmethod
+    def build(cls, documents, max_features):
+        """Hujjatlar chastotasi (df) bo'yicha eng ko'p uchraydigan max_features ta so'z."""
+        df = Counter()
+        for terms in documents:
+            df.update(terms.keys())
+        top = sorted(df.items(), key=lambda item: (-item[1], item[0]))[:max_features]
+        total = len(documents)
+        return cls([term for term, _ in top], [math.log((1 + total) / (1 + count)) + 1 for _, count in top])
+
+    @classmethod
+    def from_payload(cls, payload):
+        if not payload.get('terms'):
+            return None
+        return cls(payload['terms'], payload['idf'])
+
+    def to_payload(self):
+        return {'terms': self.terms, 'idf': [round(float(value), 6) for value in self.idf]}
+
+    def vectorize(self, terms):
+        """Counter -> (indekslar, L2-normallangan og'irliklar); lug'atda yo'q so'zlar tashlab yuboriladi."""
+        known = [(self.index[term], count) for term, count in terms.items() if term in self.index]
+        if not known:
+            return [], []
+        known.sort()
+        indices = np.fromiter((position for position, _ in known), dtype=np.int64, count=len(known))
+        counts = np.fromiter((count for _, count in known), dtype=np.float32, count=len(known))
+        weights = (1 + np.log(counts)) * self.idf[indices]
+        weights /= np.linalg.norm(weights)
+        return indices.tolist(), [round(float(weight), 6) for weight in weights]
+
+
+def dense_block(vectors, width):
+    block = np.zeros((len(vectors), width), dtype=np.float32)
+    for row, (indices, weights) in enumerate(vectors):
+        if indices:
+            block[row, indices] = weights
+    return block
+
+
+def top_neighbours(row_ids, row_vectors, col_ids, col_vectors, width, k):
+    """
+    Har bir qator uchun ustunlar orasidan eng o'xshash k tasini beradi:
+    (qator_id, [(ustun_id, o'xshashlik), ...]) juftliklari. O'zi va nol
+    o'xshashliklar chiqarib tashlanadi.
+    """
+    col_ids = np.asarray(col_ids, dtype=np.int64)
+    for row_start in range(0, len(row_ids), BLOCK_SIZE):
+        block_ids = np.asarray(row_ids[row_start:row_start + BLOCK_SIZE], dtype=np.int64)
+        queries = dense_block(row_vectors[row_start:row_start + BLOCK_SIZE], width)
+        best_scores = np.full((len(block_ids), k), -np.inf, dtype=np.float32)
+        best_ids = np.full((len(block_ids), k), -1, dtype=np.int64)
+
+        for col_start in range(0, len(col_ids), BLOCK_SIZE):
+            block_col_ids = col_ids[col_start:col_start + BLOCK_SIZE]
+            scores = queries @ dense_block(col_vectors[col_start:col_start + BLOCK_SIZE], width).T
+            scores[block_ids[:, None] == block_col_ids[None, :]] = -np.inf
+
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_ids = np.concatenate([best_ids, np.broadcast_to(block_col_ids, scores.shape)], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        for row, product_id in enumerate(block_ids.tolist()):
+            yield product_id, [
+                (related_id, round(float(score), 6))
+                for related_id, score in zip(best_ids[row].tolist(), best_scores[row].tolist())
+                if score > 0
+            ]
+
+
+def _product_rows(queryset):
+    return queryset.order_by('id').values_list('id', 'name', 'description', 'category_id', 'category__name')
+
+
+def _save_vectors(rows, full):
+    if full:
+        ProductTextVector.objects.all().delete()
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        ProductTextVector.objects.bulk_create(
+            [
+                ProductTextVector(product_id=product_id, indices=indices, weights=weights, fingerprint=digest)
+                for product_id, digest, (indices, weights) in rows[start:start + WRITE_BATCH_SIZE]
+            ],
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['indices', 'weights', 'fingerprint'],
+        )
+
+
+def _all_vectors(changed, full):
+    """Butun katalog vektorlari (id tartibida): bazadagilar o'zgarganlarning yangi vektorlari bilan almashtiriladi."""
+    vectors = {}
+    if not full:
+        for product_id, indices, weights in ProductTextVector.objects.values_list(
+            'product_id', 'indices', 'weights'
+        ).iterator(chunk_size=WRITE_BATCH_SIZE):
+            vectors[product_id] = (indices, weights)
+    vectors.update((product_id, vector) for product_id, _, vector in changed)
+    ids = sorted(vectors)
+    return ids, [vectors[product_id] for product_id in ids]
+
+
+def build_similar_products(full=False, limit=None):
+    """
+    Matn o'xshashligi bo'yicha tavsiyalarni quradi yoki yangilaydi.
+    Qaytaradi: (vektorlangan mahsulotlar, ro'yxati yangilangan mahsulotlar).
+    """
+    limit = limit or settings.RELATED_PRODUCTS_LIMIT
+    started = timezone.now()
+    state, _ = BatchJobState.objects.get_or_create(name=JOB_NAME)
+    vocabulary = None if full else Vocabulary.from_payload(state.payload)
+    full = vocabulary is None
+
+    products = Product.objects.all()
+    if not full and state.watermark is not None:
+        products = products.filter(updated_at__gt=state.watermark)
+    known = {} if full else dict(ProductTextVector.objects.values_list('product_id', 'fingerprint'))
+
+    documents = []
+    for product_id, name, description, category_id, category_name in _product_rows(products).iterator():
+        digest = fingerprint(name, description, category_id, category_name)
+        if known.get(product_id) != digest:
+            documents.append((product_id, digest, document_terms(name, description, category_id, category_name)))
+
+    if full:
+        vocabulary = Vocabulary.build([terms for _, _, terms in documents], settings.CONTENT_SIMILARITY_MAX_FEATURES)
+    changed = [(product_id, digest, vocabulary.vectorize(terms)) for product_id, digest, terms in documents]
+    del documents
+
+    neighbours = {}
+    rebuild = bool(changed) and len(vocabulary) > 0
+    if rebuild:
+        all_ids, all_vectors = _all_vectors(changed, full)
+        changed_ids = [product_id for product_id, _, _ in changed]
+        changed_vectors = [vector for _, _, vector in changed]
+        width = len(vocabulary)
+
+        # O'zgarganlar: ro'yxat butun katalogga nisbatan noldan hisoblanadi
+        neighbours = dict(top_neighbours(changed_ids, changed_vectors, all_ids, all_vectors, width, limit))
+        if not full:
+            neighbours.update(_merge_into_existing(changed_ids, changed_vectors, all_ids, all_vectors, width, limit))
+
+    # Vektorlar, watermark va ro'yxatlar birga yoziladi: yarmida uzilsa keyingi ishga tushirish shu mahsulotlarni qayta oladi
+    with transaction.atomic():
+        _save_vectors(changed, full)
+        state.payload = vocabulary.to_payload() if full else state.payload
+        state.watermark = started
+        state.save()
+        if rebuild:
+            if full:
+                RelatedProduct.objects.filter(kind=RelatedProduct.CONTENT).delete()
+            store_related(RelatedProduct.CONTENT, neighbours)
+            response_cache.bump(RelatedProduct)
+    return len(changed), len(neighbours)
+
+
+def _merge_into_existing(changed_ids, changed_vectors, all_ids, all_vectors, width, limit):
+    """
+    Qolgan mahsulotlar ro'yxatiga o'zgargan mahsulotlarni qo'shadi: eski
+    ro'yxatdagi o'zgarganlar olib tashlanib, yangi o'xshashliklari bilan
+    qaytadan birlashtiriladi.
+    """
+    changed_set = set(changed_ids)
+    candidates = {
+        product_id: entries
+        for product_id, entries in top_neighbours(all_ids, all_vectors, changed_ids, changed_vectors, width, limit)
+        if product_id not in changed_set and entries
+    }
+    # O'zgargan mahsulot ro'yxatida bo'lgan, lekin endi o'xshash bo'lmaganlar ham yangilanadi
+    stale = set(
+        RelatedProduct.objects.filter(kind=RelatedProduct.CONTENT, related_id__in=changed_ids)
+        .exclude(product_id__in=changed_ids)
+        .values_list('product_id', flat=True)
+    )
+    affected = sorted((set(candidates) | stale) - changed_set)
+
+    merged = {}
+    for start in range(0, len(affected), WRITE_BATCH_SIZE):
+        chunk = affected[start:start + WRITE_BATCH_SIZE]
+        existing = {product_id: [] for product_id in chunk}
+        for product_id, related_id, score in RelatedProduct.objects.filter(
+            kind=RelatedProduct.CONTENT, product_id__in=chunk
+        ).values_list('product_id', 'related_id', 'score'):
+            if related_id not in changed_set:
+                existing[product_id].append((related_id, score))
+        for product_id, entries in existing.items():
+            entries.extend(candidates.get(product_id, []))
+            entries.sort(key=lambda entry: (-entry[1], entry[0]))
+            merged[product_id] = entries[:limit]
+    return merged
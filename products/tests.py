@@ -1,3 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Category, Favorite, Product, ProductCooccurrence, ProductImage, ViewedProduct
+from .recommendations import build_related_products
+
+
+class ProductListQueryCountTests(APITestCase):
+    """Mahsulotlar ro'yxati so'rovlar soni sahifa hajmiga bog'liq bo'lmasligi kerak."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.seller = User.objects.create_user(email='seller@example.com', password='pass', is_active=True)
+        cls.buyer = User.objects.create_user(email='buyer@example.com', password='pass', is_active=True)
+        cls.category = Category.objects.create(name='kulolchilik')
+        for index in range(30):
+            product = Product.objects.create(
+                user=cls.seller, name=f'Product {index}', description='Qo‘lda yasalgan',
+                price=100 + index, category=cls.category, address='Nukus',
+            )
+            ProductImage.objects.create(product=product, image=f'product_images/{index}.jpg')
+            if index % 2:
+                Favorite.objects.create(user=cls.buyer, product=product)
+
+    def setUp(self):
+        # Javob keshi testlar orasida saqlanib qoladi: har safar haqiqiy so'rovlar sanaladi
+        cache.clear()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_product_list_query_count_is_constant(self):
+        self.client.force_authenticate(self.buyer)
+        small, _ = self.count_queries('/api/products/?page_size=2')
+        large, response = self.count_queries('/api/products/?page_size=30')
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_like_values_match_favorites(self):
+        self.client.force_authenticate(self.buyer)
+        _, response = self.count_queries('/api/products/?page_size=30')
+        favorites = set(Favorite.objects.filter(user=self.buyer).values_list('product_id', flat=True))
+        for item in response.data['results']:
+            self.assertEqual(item['is_liked'], item['id'] in favorites)
+            self.assertEqual(item['like_count'], 1 if item['id'] in favorites else 0)
+            self.assertEqual(len(item['product_images']), 1)
+
+    def test_category_products_query_count_is_constant(self):
+        small, _ = self.count_queries(f'/api/categories/{self.category.name}/?page_size=2')
+        large, _ = self.count_queries(f'/api/categories/{self.category.name}/?page_size=30')
+        self.assertEqual(small, large)
+
+
+class RelatedProductsBuildTests(TestCase):
+    """Inkremental hisob qayta ko'rishlardan keyin ham to'liq qayta qurish bilan bir xil bo'lishi kerak."""
+
+    def cooccurrences(self):
+        return dict(((row[0], row[1]), row[2]) for row in ProductCooccurrence.objects.values_list('product_id', 'other_id', 'count'))
+
+    def test_incremental_run_matches_full_rebuild_after_reviews(self):
+        user = get_user_model().objects.create_user(email='viewer@example.com', password='pass', is_active=True)
+        seller = get_user_model().objects.create_user(email='maker@example.com', password='pass', is_active=True)
+        category = Category.objects.create(name='to‘qimachilik')
+        first, second, third = [
+            Product.objects.create(user=seller, name=f'Gilam {index}', description='Qo‘lda to‘qilgan',
+                                   price=100, category=category, address='Xiva')
+            for index in range(3)
+        ]
+        past = timezone.now() - timedelta(hours=2)
+        ViewedProduct.objects.create(user=user, product=first, viewed_at=past, first_viewed_at=past)
+        ViewedProduct.objects.create(user=user, product=second, viewed_at=past + timedelta(minutes=1),
+                                     first_viewed_at=past + timedelta(minutes=1))
+        build_related_products()
 
-# Create your tests here.
+        ViewedProduct.objects.record(user, first)
+        ViewedProduct.objects.record(user, third)
+        with mock.patch('products.recommendations.timezone.now', return_value=timezone.now() + timedelta(hours=1)):
+            build_related_products()
+            incremental = self.cooccurrences()
+            build_related_products(full=True)
+        self.assertEqual(incremental[(first.pk, second.pk)], 1)
+        self.assertEqual(incremental, self.cooccurrences())
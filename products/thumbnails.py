@@ -0,0 +1,156 @@
+"""
+ProductImage uchun kichraytirilgan nusxalar (thumbnail) va WebP variantlari.
+
+Rasmni qayta ishlash Pillow bilan alohida jarayonlar pulida bajariladi.
+`render_variants` faqat Pillow va standart kutubxonaga tayanadi (Django
+modellari import qilinmaydi), shuning uchun u "spawn" qilingan jarayonda
+ham xavfsiz ishlaydi va tayyor baytlarni qaytaradi. Fayllar asosiy
+jarayonda storage orqali yoziladi; nomlar ProductImage pk'sidan olinadi
+(`product_images/variants/<pk>/thumb.webp`), shuning uchun turli
+kengaytmali bir xil nomli rasmlar yoki foydalanuvchi fayllari bilan
+to'qnashmaydi.
+"""
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Variant nomi -> eng uzun tomonning piksel o'lchami
+VARIANT_SIZES = {
+    'thumb': 200,
+    'medium': 600,
+}
+
+# Format -> (kengaytma, Pillow formati, shaffoflikni saqlaydimi, saqlash parametrlari)
+VARIANT_FORMATS = {
+    'jpeg': ('.jpg', 'JPEG', False, {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': ('.webp', 'WEBP', True, {'quality': 80, 'method': 4}),
+}
+
+BACKGROUND = (255, 255, 255)
+
+
+def variant_name(pk, variant, fmt):
+    return f'product_images/variants/{pk}/{variant}{VARIANT_FORMATS[fmt][0]}'
+
+
+def has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def prepare(image):
+    """(shaffofsiz RGB, shaffoflik saqlangan nusxa): shaffof joylar oq fonga qo'yiladi."""
+    if not has_alpha(image):
+        image = image.convert('RGB')
+        return image, image
+    rgba = image.convert('RGBA')
+    flat = Image.new('RGB', rgba.size, BACKGROUND)
+    flat.paste(rgba, mask=rgba.getchannel('A'))
+    return flat, rgba
+
+
+def render_variants(source_path):
+    """Bitta rasm uchun {variant: {format: baytlar}} lug'ati."""
+    variants = {}
+    with Image.open(source_path) as original:
+        flat, transparent = prepare(ImageOps.exif_transpose(original))
+        for variant, size in VARIANT_SIZES.items():
+            variants[variant] = {}
+            for fmt, (_, pil_format, keeps_alpha, options) in VARIANT_FORMATS.items():
+                resized = (transparent if keeps_alpha else flat).copy()
+                resized.thumbnail((size, size), Image.LANCZOS)
+                output = io.BytesIO()
+                resized.save(output, pil_format, **options)
+                variants[variant][fmt] = output.getvalue()
+    return variants
+
+
+def render_job(job):
+    """Pul uchun: (pk, source_path, name) -> (pk, {variant: {format: baytlar}} yoki None)."""
+    pk, source_path, name = job
+    try:
+        return pk, render_variants(source_path)
+    except Exception:
+        logger.exception("Rasm variantlarini yaratib bo'lmadi: %s", name)
+        return pk, None
+
+
+def save_variants(pk, rendered, storage=default_storage):
+    """Baytlarni storage orqali yozadi va {variant: {format: nom}} qaytaradi."""
+    variants = {}
+    for variant, formats in rendered.items():
+        variants[variant] = {}
+        for fmt, content in formats.items():
+            name = variant_name(pk, variant, fmt)
+            # Qayta yaratishda (--force) eski fayl almashtiriladi, yangi nom olinmaydi
+            if storage.exists(name):
+                storage.delete(name)
+            variants[variant][fmt] = storage.save(name, ContentFile(content))
+    return variants
+
+
+def build_job(product_image):
+    """Lokal fayl tizimidagi rasm uchun ish tavsifi; aks holda None."""
+    if not product_image.image:
+        return None
+    try:
+        source_path = product_image.image.path
+    except NotImplementedError:
+        # Masalan, S3 kabi tashqi storage: lokal yo'l yo'q
+        return None
+    return (product_image.pk, source_path, product_image.image.name)
+
+
+def create_executor(max_workers=None):
+    return ProcessPoolExecutor(
+        max_workers=max_workers or settings.IMAGE_VARIANT_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = create_executor()
+    return _executor
+
+
+def schedule_variants(product_image):
+    """Tranzaksiya commit bo'lgach variantlarni fon jarayonida yaratadi."""
+    job = build_job(product_image)
+    if job is None:
+        return
+    model = type(product_image)
+    transaction.on_commit(lambda: _submit(model, job))
+
+
+def _submit(model, job):
+    future = _get_executor().submit(render_job, job)
+    future.add_done_callback(lambda done: _store_variants(model, done))
+
+
+def _store_variants(model, future):
+    # Callback pulning ichki oqimida ishlaydi: o'z DB ulanishini yopib ketadi
+    try:
+        pk, rendered = future.result()
+        if rendered:
+            model.store_variants(pk, save_variants(pk, rendered))
+    except Exception:
+        logger.exception("Rasm variantlarini saqlashda xato")
+    finally:
+        connection.close()
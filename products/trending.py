@@ -0,0 +1,90 @@
+"""
+Vaqt o'tishi bilan so'nuvchi trend reytingi.
+
+Ko'rishlar, like'lar va savatga qo'shishlar har biri bitta GROUP BY
+so'rovi bilan (mahsulot, kun) bo'yicha sanaladi, keyin NumPy'da
+eksponensial so'nish bilan og'irlanib yig'iladi:
+
+    score = sum(og'irlik * son * 0.5 ** (kun_yoshi / yarim_yemirilish))
+
+Natija TrendingScore jadvaliga to'liq almashtirib yoziladi; endpoint
+faqat shu jadvaldan o'qiydi.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import response_cache
+from .models import CartItem, Favorite, Product, TrendingScore, ViewedProduct
+
+# Signal -> (model, vaqt maydoni, og'irlik)
+SIGNALS = {
+    'view': (ViewedProduct, 'viewed_at', 1.0),
+    'like': (Favorite, 'created_at', 3.0),
+    'cart': (CartItem, 'added_at', 5.0),
+}
+WRITE_BATCH_SIZE = 1000
+
+
+def daily_counts(model, field, since):
+    """(product_id, kun, son) qatorlari: bitta agregat so'rov."""
+    return (
+        model.objects.filter(**{f'{field}__gte': since})
+        .annotate(day=TruncDate(field))
+        .order_by()
+        .values('product_id', 'day')
+        .annotate(count=Count('id'))
+        .values_list('product_id', 'day', 'count')
+    )
+
+
+def compute_scores(now=None):
+    """{product_id: score} lug'ati."""
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    since = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+
+    products, ages, weights = [], [], []
+    for model, field, weight in SIGNALS.values():
+        rows = list(daily_counts(model, field, since))
+        products.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+        ages.append(np.fromiter(((today - row[1]).days for row in rows), dtype=np.float64, count=len(rows)))
+        weights.append(np.fromiter((weight * row[2] for row in rows), dtype=np.float64, count=len(rows)))
+
+    products = np.concatenate(products)
+    if not len(products):
+        return {}
+    decayed = np.concatenate(weights) * np.power(0.5, np.concatenate(ages) / settings.TRENDING_HALF_LIFE_DAYS)
+    product_ids, inverse = np.unique(products, return_inverse=True)
+    scores = np.bincount(inverse, weights=decayed)
+    return dict(zip(product_ids.tolist(), scores.tolist()))
+
+
+def refresh_trending(now=None):
+    """TrendingScore jadvalini qayta quradi va yozilgan qatorlar sonini qaytaradi."""
+    now = now or timezone.now()
+    scores = compute_scores(now)
+    ids = list(scores)
+    categories = {}
+    for start in range(0, len(ids), WRITE_BATCH_SIZE):
+        categories.update(
+            Product.objects.filter(pk__in=ids[start:start + WRITE_BATCH_SIZE]).values_list('id', 'category_id')
+        )
+
+    with transaction.atomic():
+        TrendingScore.objects.all().delete()
+        TrendingScore.objects.bulk_create(
+            [
+                TrendingScore(product_id=product_id, category_id=categories[product_id], score=score, computed_at=now)
+                for product_id, score in scores.items()
+                if product_id in categories
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    response_cache.bump(TrendingScore)
+    return len(categories)
@@ -0,0 +1,149 @@
+"""
+Katta fayllarni bo'laklab (resumable) yuklash.
+
+Protokol:
+    POST   /api/uploads/                 sessiya ochish (mahsulot, maydon, fayl nomi, hajmi)
+    GET    /api/uploads/{id}/            qayerdan davom ettirish kerakligi (offset)
+    PUT    /api/uploads/{id}/            Content-Range: bytes <start>-<end>/<size>, tana — xom baytlar
+    POST   /api/uploads/{id}/complete/   faylni mahsulotga biriktirish
+    DELETE /api/uploads/{id}/            bekor qilish
+
+Bo'lak so'rov oqimidan kichik qismlarda o'qilib to'g'ridan-to'g'ri
+vaqtinchalik faylga yoziladi — xotirada to'liq saqlanmaydi. Offset faqat
+baytlar diskka yozilgandan keyin oshiriladi, shuning uchun uzilgan bo'lak
+shunchaki qayta yuboriladi. Foydalanuvchining faol sessiyalari soni
+UPLOAD_MAX_ACTIVE_SESSIONS bilan cheklanadi.
+"""
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Product, UploadSession
+
+READ_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(ValueError):
+    status_code = 400
+
+
+class UploadLimitError(UploadError):
+    status_code = 429
+
+
+class OffsetMismatch(UploadError):
+    """Bo'lak kutilgan joydan boshlanmadi; mijoz `offset` dan davom ettirishi kerak."""
+    status_code = 409
+
+    def __init__(self, offset):
+        super().__init__(f"Bo‘lak {offset}-baytdan boshlanishi kerak")
+        self.offset = offset
+
+
+class SessionGone(UploadError):
+    """Sessiya boshqa so'rov tomonidan yakunlangan yoki bekor qilingan."""
+    status_code = 410
+
+    def __init__(self):
+        super().__init__("Yuklash sessiyasi allaqachon yakunlangan yoki bekor qilingan")
+
+
+class SessionFile(File):
+    # FileSystemStorage vaqtinchalik faylni nusxalamasdan ko'chiradi (file_move_safe)
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def active_sessions(user):
+    """Muddati o'tmagan (oxirgi UPLOAD_SESSION_TTL soniyada yangilangan) sessiyalar."""
+    since = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    return UploadSession.objects.filter(user=user, updated_at__gte=since)
+
+
+def expired_sessions():
+    return UploadSession.objects.filter(updated_at__lt=timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL))
+
+
+def create_session(user, product, filename, size, field=UploadSession.THREED_MODEL):
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    with transaction.atomic():
+        # Bir foydalanuvchining parallel so'rovlari limitni birga oshirib yubormasligi uchun
+        get_user_model().objects.select_for_update().filter(pk=user.pk).first()
+        if active_sessions(user).count() >= settings.UPLOAD_MAX_ACTIVE_SESSIONS:
+            raise UploadLimitError(
+                f"Bir vaqtda {settings.UPLOAD_MAX_ACTIVE_SESSIONS} tadan ortiq yuklash mumkin emas"
+            )
+        session = UploadSession.objects.create(user=user, product=product, field=field, filename=filename, size=size)
+    open(session.temp_path, 'wb').close()
+    return session
+
+
+def parse_content_range(header, size):
+    """'bytes 0-1048575/5242880' -> (start, end); oxirgi bayt ham kiradi."""
+    match = CONTENT_RANGE_RE.match((header or '').strip())
+    if match is None:
+        raise UploadError("Content-Range sarlavhasi 'bytes <start>-<end>/<size>' ko‘rinishida bo‘lishi kerak")
+    start, end, total = map(int, match.groups())
+    if total != size or start > end or end >= size:
+        raise UploadError("Content-Range sessiya hajmiga mos emas")
+    if end - start + 1 > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadError(f"Bo‘lak hajmi {settings.UPLOAD_CHUNK_MAX_SIZE} baytdan oshmasligi kerak")
+    return start, end
+
+
+def write_chunk(session, stream, start, end):
+    """Bo'lakni oqimdan diskka yozadi va yangi offset'ni qaytaradi."""
+    if start != session.offset:
+        raise OffsetMismatch(session.offset)
+    if stream is None:
+        raise UploadError("So‘rov tanasi bo‘sh")
+    expected = end - start + 1
+    received = 0
+    with open(session.temp_path, 'r+b') as target:
+        target.seek(start)
+        while received < expected:
+            data = stream.read(min(READ_SIZE, expected - received))
+            if not data:
+                break
+            target.write(data)
+            received += len(data)
+        if received != expected or stream.read(1):
+            raise UploadError("So‘rov tanasi hajmi Content-Range bilan mos emas")
+        target.flush()
+        os.fsync(target.fileno())
+
+    # Parallel so'rov shu bo'lakni allaqachon yozgan bo'lsa offset ikki marta oshmaydi
+    updated = UploadSession.objects.filter(pk=session.pk, offset=start).update(
+        offset=end + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        raise OffsetMismatch(UploadSession.objects.filter(pk=session.pk).values_list('offset', flat=True).first() or 0)
+    session.offset = end + 1
+    return session.offset
+
+
+def complete_session(session):
+    """To'liq yuklangan faylni mahsulot maydoniga saqlaydi va sessiyani o'chiradi."""
+    with transaction.atomic():
+        # Parallel complete so'rovlari bitta vaqtinchalik faylni ikki marta ko'chirmasligi uchun
+        session = UploadSession.objects.select_for_update().filter(pk=session.pk).first()
+        if session is None:
+            raise SessionGone()
+        if session.offset != session.size:
+            raise OffsetMismatch(session.offset)
+        product = Product.objects.get(pk=session.product_id)
+        try:
+            with open(session.temp_path, 'rb') as source:
+                getattr(product, session.field).save(session.filename, SessionFile(source), save=False)
+        except FileNotFoundError:
+            raise SessionGone()
+        product.save(update_fields=[session.field, 'updated_at'])
+        session.delete()
+    return product
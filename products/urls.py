@@ -1,13 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CategoryViewSet, CommentViewSet, LastViewedProductsView
+from .views import ProductViewSet, CategoryViewSet, CommentViewSet, FavoriteViewSet, LastViewedProductsView, UploadSessionViewSet, CacheMetricsView, AutocompleteView, CartView
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
 router.register(r'products', ProductViewSet)
 router.register(r'comments', CommentViewSet)
+router.register(r'favorites', FavoriteViewSet, basename='favorite')
+router.register(r'uploads', UploadSessionViewSet, basename='upload-session')
 
 urlpatterns = [
+    path('cart/', CartView.as_view(), name='cart'),
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    path('cache-metrics/', CacheMetricsView.as_view(), name='cache-metrics'),
     path('last-viewed-products/', LastViewedProductsView.as_view(), name='last-viewed-products'),
     path('products/my-products/', ProductViewSet.as_view({'get': 'my_products'}), name='my-products'),
     path('categories/<str:category_name>/<int:product_id>/', ProductViewSet.as_view({'get': 'retrieve_product_in_category'}), name='category-product-detail'),
@@ -1,45 +1,108 @@
-from rest_framework import viewsets, permissions, generics, serializers
+from rest_framework import viewsets, mixins, permissions, generics, serializers
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.filters import OrderingFilter
 from rest_framework import status
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.http import Http404, StreamingHttpResponse
+from django.conf import settings
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
-from .models import Product, Category, Favorite, CartItem, Comment, ViewedProduct
-from .serializers import ProductSerializer, CategorySerializer,  CommentSerializer, ViewedProductSerializer, FavoriteSerializer, CartItemSerializer
+from .models import Product, ProductImage, Category, Favorite, CartItem, Comment, ViewedProduct, RelatedProduct, TrendingScore, UploadSession
+from .serializers import ProductSerializer, CategorySerializer,  CommentSerializer, ProductCommentSerializer, CartLineSerializer, CartUpdateSerializer, ViewedProductSerializer, FavoriteSerializer, FavoriteProductSerializer, FavoriteBatchSerializer, SellerCardSerializer, UploadSessionSerializer, CartItemSerializer
 from .permissions import IsOwnerOrReadOnly, IsAdminForCreate
+from .pagination import CommentCursorPagination, FavoriteCursorPagination, ProductCursorPagination, StandardPagination
+from .filters import ProductFilter, facet_counts
+from .conditional import ConditionalGetMixin
+from .response_cache import CachedResponseMixin, cache_response
+from . import autocomplete, search, counters, importers, exporters, response_cache, uploads
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def model_freshness(view, dependencies, last_modified_model=None):
+    """
+    Versiya — bog'liq modellar avlodlari (o'chirishda ham o'zgaradi). Last-Modified
+    faqat retrieve'da va javobdagi hamma narsani updated_at qamrab olsa
+    (last_modified_model) beriladi; ro'yxatlar uchun MAX(updated_at) o'chirishni sezmaydi.
+    """
+    version = response_cache.dependency_version(dependencies)
+    if view.action != 'retrieve' or last_modified_model is None:
+        return None, version
+    try:
+        updated_at = last_modified_model.objects.filter(pk=view.get_lookup_value()).values_list('updated_at', flat=True).first()
+    except (ValueError, TypeError):
+        return None
+    return None if updated_at is None else (updated_at, (updated_at, version))
+
+
+def per_product(model, aggregate):
+    """Mahsulot qatori uchun bog'liq jadval bo'yicha korrelyatsiyalangan agregat (JOIN ko'paytmasisiz)."""
+    return Subquery(
+        model.objects.filter(product=OuterRef('pk')).order_by().values('product').annotate(value=aggregate).values('value')
+    )
+
+
+# Mahsulot javoblari bog'liq modellar (serializer rasmlar va like'larni ham beradi)
+PRODUCT_CACHE_DEPENDENCIES = (Product, ProductImage, Category, Favorite)
+
+
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminForCreate]
+    cache_dependencies = (Category,)
+
+    def get_freshness(self, request):
+        return model_freshness(self, self.cache_dependencies, Category)
 
 
     @action(detail=False, methods=['get'], url_path='(?P<category_name>[^/]+)')
+    @cache_response(dependencies=PRODUCT_CACHE_DEPENDENCIES, per_user=True)
     def category_products(self, request, category_name=None):
         try:
             # Kategoriya nomiga ko'ra kategoriya olish
             category = Category.objects.get(name=category_name)
-            products = Product.objects.filter(category=category)
-            serializer = ProductSerializer(products, many=True)
-            return Response(serializer.data)
         except Category.DoesNotExist:
             return Response({"detail": "Kategoriya topilmadi"}, status=404)
-        
+        products = Product.objects.with_stats(request.user).filter(category=category)
+        paginator = ProductCursorPagination()
+        page = paginator.paginate_queryset(products, request, view=self)
+        serializer = ProductSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
 
-# class StandardPagination(PageNumberPagination):
-#     page_size = 10  # Har bir sahifada 10 ta mahsulot
-#     page_size_query_param = 'page_size'  # Foydalanuvchi sahifa hajmini o‘zgartirishi mumkin
-#     max_page_size = 100  
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsOwnerOrReadOnly, permissions.IsAuthenticatedOrReadOnly]
-    # pagination_class = StandardPagination
-    # filter_backends = [DjangoFilterBackend, SearchFilter]
-    # filterset_fields = ['price', 'category']
-    # search_fields = ['name', 'description']
+    pagination_class = ProductCursorPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = ProductFilter
+    # ?ordering=-rating_avg kabi; keyset sahifalash oxiriga id qo'shadi
+    ordering_fields = ['created_at', 'price', 'effective_price', 'rating_avg', 'rating_count']
+    ordering = ['-created_at']
+    cache_dependencies = PRODUCT_CACHE_DEPENDENCIES
+    # is_liked foydalanuvchiga bog'liq
+    cache_per_user = True
+
+    def get_queryset(self):
+        return Product.objects.with_stats(self.request.user)
+
+    def get_freshness(self, request):
+        if self.action == 'bundle':
+            return self.bundle_freshness(request)
+        # Rasmlar va like'lar mahsulot updated_at'iga ta'sir qilmaydi: faqat avlodlar bo'yicha ETag
+        return model_freshness(self, self.cache_dependencies)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.action == 'list':
+            # Facet sonlari annotatsiyasiz asosiy queryset ustida hisoblanadi (javob bilan birga keshlanadi)
+            response.data['facets'] = facet_counts(self.request.query_params, Product.objects.all())
+        return response
 
     def perform_create(self, serializer):
         if not self.request.user.is_verified:
@@ -52,17 +115,71 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_products(self, request):
         """Foydalanuvchining o‘z mahsulotlarini qaytaradi"""
-        products = Product.objects.filter(user=request.user)
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        products = self.filter_queryset(self.get_queryset()).filter(user=request.user)
+        page = self.paginate_queryset(products)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+            permission_classes=[permissions.IsAuthenticated])
+    def import_products(self, request):
+        """CSV/JSONL fayldan mahsulotlarni ommaviy qo'shish; xato qatorlar hisobotda qaytariladi"""
+        if not request.user.is_verified:
+            raise serializers.ValidationError(
+                {"detail": "Faqat tasdiqlangan sotuvchilar mahsulot qo‘shishi mumkin."}
+            )
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Fayl (file) yuborilmagan"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            fmt = importers.detect_format(upload.name, request.data.get('format'))
+        except importers.ImportFormatError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = importers.ProductImporter(request.user).run(importers.iter_rows(upload, fmt))
+        return Response(report)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def export(self, request):
+        """Katalogni JSONL (standart) yoki CSV (?fmt=csv) ko'rinishida oqim bilan yuklab berish"""
+        fmt = request.query_params.get('fmt', 'jsonl')
+        if fmt not in exporters.FORMATS:
+            return Response({"detail": "fmt jsonl yoki csv bo‘lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+        # Ro'yxat bilan bir xil filtrlar, lekin annotatsiya va prefetch'siz
+        queryset = self.filter_queryset(Product.objects.all())
+        response = StreamingHttpResponse(exporters.stream(queryset, fmt), content_type=exporters.FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="products.{fmt}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    @cache_response()
+    def search(self, request):
+        """Nomi va tavsifi bo'yicha bm25 reytingli, prefiksli qidiruv"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"detail": "Qidiruv so‘zi (q) kiritilmagan"}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = StandardPagination()
+        hits = paginator.paginate_queryset(search.search_products(query, Product.objects.all()), request, view=self)
+        products = self.get_queryset().in_bulk([hit.id for hit in hits])
+        results = []
+        for hit in hits:
+            product = products.get(hit.id)
+            if product is None:
+                continue
+            item = self.get_serializer(product).data
+            item['highlight'] = {'name': hit.name, 'description': hit.snippet}
+            results.append(item)
+        return paginator.get_paginated_response(results)
 
     # Maxsus action - kategoriya nomi va mahsulot ID'si bilan mahsulotni olish
     @action(detail=False, methods=['get'], url_path='categories/(?P<category_name>[^/]+)/(?P<product_id>\d+)')
+    @cache_response()
     def retrieve_product_in_category(self, request, category_name=None, product_id=None):
         try:
             category = Category.objects.get(name=category_name)
-            product = Product.objects.get(id=product_id, category=category)
-            serializer = ProductSerializer(product)
+            product = Product.objects.with_stats(request.user).get(id=product_id, category=category)
+            serializer = ProductSerializer(product, context={'request': request})
             return Response(serializer.data)
         except Category.DoesNotExist:
             return Response({"detail": "Kategoriya topilmadi"}, status=status.HTTP_404_NOT_FOUND)
@@ -70,6 +187,130 @@ class ProductViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Bu kategoriyada mahsulot topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
 
+    @action(detail=False, methods=['get'])
+    @cache_response(dependencies=PRODUCT_CACHE_DEPENDENCIES + (TrendingScore,))
+    def trending(self, request):
+        """Trenddagi mahsulotlar (refresh_trending buyrug'i hisoblaydi); ?category=<id> bilan kategoriya bo'yicha"""
+        products = self.get_queryset().filter(trending__isnull=False)
+        category = request.query_params.get('category')
+        if category:
+            if not category.isdigit():
+                return Response({"detail": "category butun son bo‘lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+            products = products.filter(trending__category_id=category)
+        products = products.order_by('-trending__score', '-id')
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(products, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    @cache_response(dependencies=PRODUCT_CACHE_DEPENDENCIES + (RelatedProduct,))
+    def related(self, request, pk=None):
+        """
+        O'xshash mahsulotlar: ?kind=views (standart) — shu mahsulotni ko'rganlar ko'rganlari
+        (build_related_products), ?kind=content — matni o'xshashlari (build_similar_products)
+        """
+        if not str(pk).isdigit():
+            raise Http404
+        kind = request.query_params.get('kind', RelatedProduct.VIEWS)
+        if kind not in dict(RelatedProduct.KIND_CHOICES):
+            return Response({"detail": "kind views yoki content bo‘lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+        products = self.get_queryset().filter(
+            related_from__product_id=pk, related_from__kind=kind
+        ).order_by('related_from__rank')
+        serializer = self.get_serializer(products, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='comments')
+    def product_comments(self, request, pk=None):
+        """Mahsulot izohlari: keyset sahifalash, ?sort=recent|rating"""
+        if not str(pk).isdigit():
+            raise Http404
+        comments = Comment.objects.filter(product_id=pk).select_related('user__profile')
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        if not page and not paginator.cursor and not Product.objects.filter(pk=pk).exists():
+            raise Http404
+        serializer = ProductCommentSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """
+        Mahsulot sahifasi uchun hammasi bitta javobda: mahsulot va rasmlari,
+        sotuvchi kartasi, reyting, izohlarning birinchi sahifasi va o'xshash
+        mahsulotlar id'lari. Umumiy qism mahsulot versiyasi bo'yicha keshlanadi,
+        is_liked har safar alohida tekshiriladi.
+        """
+        return self.conditional_response(request, lambda: self.render_bundle(request, pk))
+
+    def bundle_freshness(self, request):
+        """
+        Bundle'dagi hamma narsa shu mahsulotga tegishli qiymatlar bilan versiyalanadi
+        (bitta so'rov): mahsulot, profil va ustaxona updated_at'lari, sotuvchi kartasi
+        maydonlari, like soni va rasmlar holati. Boshqa mahsulotdagi like yoki
+        foydalanuvchining login qilishi bundle'ni eskirtirmaydi.
+        """
+        if not str(self.kwargs['pk']).isdigit():
+            raise Http404
+        row = Product.objects.filter(pk=self.kwargs['pk']).annotate(
+            like_count=Coalesce(per_product(Favorite, Count('id')), 0),
+            image_count=Coalesce(per_product(ProductImage, Count('id')), 0),
+            image_last=per_product(ProductImage, Max('id')),
+            # Variantlar fon ishida tayyor bo'lganda URL'lar o'zgaradi
+            image_ready=Coalesce(per_product(ProductImage, Count('id', filter=~Q(variants={}))), 0),
+        ).values_list(
+            'updated_at', 'user__profile__updated_at', 'user__workshop__updated_at',
+            'user__first_name', 'user__last_name', 'user__is_verified',
+            'like_count', 'image_count', 'image_last', 'image_ready', 'view_count',
+        ).first()
+        if row is None:
+            raise Http404
+        # Tavsiyalar fon ishida yoziladi (avlod). view_count faqat ETag'ga kiradi, keshlangan bundle esa unga bog'liq emas
+        self.bundle_version = (row[:-1], response_cache.dependency_version((RelatedProduct,)))
+        self.bundle_view_count = row[-1]
+        return max(filter(None, row[:3])), (self.bundle_version, row[-1])
+
+    def render_bundle(self, request, pk):
+        # Rasmlar URL'lari absolyut: host ham versiyaga kiradi
+        version = (int(pk), request.build_absolute_uri('/'), self.bundle_version)
+        data, hit = response_cache.versioned('ProductViewSet.bundle', version, lambda: self.build_bundle(request, pk))
+        data['product']['is_liked'] = (
+            request.user.is_authenticated and Favorite.objects.filter(user=request.user, product_id=pk).exists()
+        )
+        data['product']['view_count'] = self.bundle_view_count
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def build_bundle(self, request, pk):
+        product = get_object_or_404(
+            Product.objects.with_stats().select_related('user__profile', 'user__workshop'), pk=pk
+        )
+        context = {'request': request}
+        paginator = CommentCursorPagination()
+        comments = paginator.first_page(
+            Comment.objects.filter(product_id=pk).select_related('user__profile'),
+            request.build_absolute_uri(reverse('product-product-comments', args=[pk])),
+        )
+        related = {kind: [] for kind, _ in RelatedProduct.KIND_CHOICES}
+        for kind, related_id in RelatedProduct.objects.filter(product_id=pk).order_by('kind', 'rank').values_list('kind', 'related_id'):
+            related[kind].append(related_id)
+        return {
+            'product': ProductSerializer(product, context=context).data,
+            'seller': SellerCardSerializer(product.user, context=context).data,
+            'rating': {
+                'avg': product.rating_avg,
+                'count': product.rating_count,
+                'histogram': product.rating_histogram,
+            },
+            'comments': {
+                'next': paginator.get_next_link(),
+                'results': ProductCommentSerializer(comments, many=True, context=context).data,
+            },
+            'related': related,
+        }
+
     @action(detail=True, methods=['post', 'delete'], permission_classes=[permissions.IsAuthenticated])
     def like(self, request, pk=None):
         product = self.get_object()
@@ -91,6 +332,11 @@ class ProductViewSet(viewsets.ModelViewSet):
         product = self.get_object()
         cart_item, created = CartItem.objects.get_or_create(user=request.user, product=product)
         if not created:
+            if cart_item.quantity >= settings.CART_MAX_QUANTITY:
+                return Response(
+                    {"detail": f"Bitta mahsulotdan {settings.CART_MAX_QUANTITY} tadan ortiq qo‘shib bo‘lmaydi"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             cart_item.quantity += 1  # Agar allaqachon savatchada bo'lsa, miqdorini oshirish
             cart_item.save()
         return Response({'status': 'added to cart', 'quantity': cart_item.quantity})
@@ -99,16 +345,13 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='view')
     def record_view(self, request, pk=None):
         """Mahsulotni ko'rish va ko'rilganligini qayd etish"""
-        product = self.get_object()
-        # Ko'rishlar sonini oshirish
-        product.view_count = models.F('view_count') + 1
-        product.save()
+        product = get_object_or_404(Product.objects.only('id', 'view_count'), pk=pk)
+        # Ko'rishlar soni buferda oshiriladi va davriy ravishda bazaga yoziladi
+        pending = counters.record_view(product.pk)
         if request.user.is_authenticated:
-            ViewedProduct.objects.create(user=request.user, product=product)
+            ViewedProduct.objects.record(request.user, product)
+        return Response({'status': 'view recorded', 'view_count': product.view_count + pending})
 
-        product.refresh_from_db()  
-        return Response({'status': 'view recorded', 'view_count': product.view_count})
-    
 class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
@@ -118,10 +361,188 @@ class CommentViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
+class FavoriteViewSet(ConditionalGetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Foydalanuvchining sevimlilari: list — mahsulotlar bilan keyset sahifalangan
+    ro'yxat, ids — yurakchalarni chizish uchun faqat mahsulot id'lari,
+    batch — bir nechta mahsulotni bitta tranzaksiyada like/unlike qilish.
+    """
+    serializer_class = FavoriteProductSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FavoriteCursorPagination
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Favorite.objects.none()
+        favorites = Favorite.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            favorites = favorites.prefetch_related(
+                Prefetch('product', queryset=Product.objects.with_stats(self.request.user))
+            )
+        return favorites
+
+    def get_freshness(self, request):
+        # Qatorlar faqat qo'shiladi yoki o'chiriladi: MAX(created_at) va COUNT yetarli.
+        # Last-Modified berilmaydi — o'chirishda MAX o'zgarmasligi mumkin.
+        stats = Favorite.objects.filter(user=request.user).aggregate(last=Max('created_at'), count=Count('id'))
+        if self.action == 'ids':
+            return None, (stats['last'], stats['count'])
+        # Ro'yxat mahsulot ma'lumotlarini (rasmlar, like_count) ham beradi
+        return None, (stats['last'], stats['count'], response_cache.dependency_version(PRODUCT_CACHE_DEPENDENCIES))
+
+    @action(detail=False, methods=['get'])
+    def ids(self, request):
+        """Yoqtirilgan mahsulotlar id'lari (ETag bilan; o'zgarmagan bo'lsa 304)"""
+        return self.conditional_response(request, lambda: Response({
+            'ids': sorted(self.get_queryset().values_list('product_id', flat=True)),
+        }))
+
+    @action(detail=False, methods=['post'], serializer_class=FavoriteBatchSerializer)
+    def batch(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        like, unlike = serializer.validated_data['like'], serializer.validated_data['unlike']
+        with transaction.atomic():
+            if unlike:
+                self.get_queryset().filter(product_id__in=unlike).delete()
+            # Allaqachon yoqtirilganlar unique_together tufayli jimgina o'tkazib yuboriladi
+            Favorite.objects.bulk_create(
+                [Favorite(user=request.user, product_id=product_id) for product_id in like],
+                ignore_conflicts=True,
+            )
+            # bulk_create signal yubormaydi: like_count/is_liked keshlari shu yerda eskiradi
+            response_cache.bump(Favorite)
+        return Response({'ids': sorted(self.get_queryset().values_list('product_id', flat=True))})
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """Katta fayllarni (3D model) bo'laklab, uzilgan joyidan davom ettirib yuklash; protokol uploads.py da"""
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return UploadSession.objects.none()
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            session = uploads.create_session(request.user, **serializer.validated_data)
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status_code)
+        return Response(self.get_serializer(session).data, status=status.HTTP_201_CREATED)
+
+    def update(self, request, pk=None):
+        """Bitta bo'lak: tana xom baytlar, joyi Content-Range sarlavhasida"""
+        session = self.get_object()
+        try:
+            start, end = uploads.parse_content_range(request.headers.get('Content-Range'), session.size)
+            # request.data o'qilmaydi: tana parser'siz, oqimdan to'g'ridan-to'g'ri diskka yoziladi
+            offset = uploads.write_chunk(session, request.stream, start, end)
+        except uploads.OffsetMismatch as exc:
+            return Response({"detail": str(exc), 'offset': exc.offset}, status=exc.status_code)
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status_code)
+        return Response({'offset': offset, 'size': session.size})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        session = self.get_object()
+        try:
+            product = uploads.complete_session(session)
+        except uploads.OffsetMismatch as exc:
+            return Response({"detail": "Fayl hali to‘liq yuklanmagan", 'offset': exc.offset}, status=exc.status_code)
+        except uploads.UploadError as exc:
+            return Response({"detail": str(exc)}, status=exc.status_code)
+        return Response(ProductSerializer(Product.objects.with_stats(request.user).get(pk=product.pk),
+                                          context=self.get_serializer_context()).data)
+
+
 class LastViewedProductsView(generics.ListAPIView):
     serializer_class = ViewedProductSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         """Foydalanuvchining oxirgi ko‘rgan mahsulotlari"""
-        return ViewedProduct.objects.filter(user=self.request.user).select_related('product')
+        if getattr(self, 'swagger_fake_view', False):
+            return ViewedProduct.objects.none()
+        return ViewedProduct.objects.filter(user=self.request.user).select_related('product')[:settings.RECENTLY_VIEWED_LIMIT]
+
+
+class CartView(generics.GenericAPIView):
+    """Savatcha: GET — qatorlar va jami summalar, PATCH — bir nechta mahsulot miqdorini birdaniga o'rnatish"""
+    serializer_class = CartUpdateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return CartItem.objects.none()
+        return CartItem.objects.filter(user=self.request.user)
+
+    def get(self, request):
+        return Response(self.cart_payload())
+
+    def patch(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        removed = [item['product'] for item in items if item['quantity'] == 0]
+        with transaction.atomic():
+            if removed:
+                self.get_queryset().filter(product_id__in=removed).delete()
+            # Mavjud qatorlar yangilanadi, yangilari qo'shiladi — bitta UPSERT
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(user=request.user, product_id=item['product'], quantity=item['quantity'])
+                    for item in items if item['quantity'] > 0
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'product'],
+                update_fields=['quantity'],
+            )
+        return Response(self.cart_payload())
+
+    def cart_payload(self):
+        items = self.get_queryset().select_related('product').order_by('-added_at', '-id')
+        money = DecimalField(max_digits=20, decimal_places=2)
+        zero = Decimal('0.00')
+        summary = self.get_queryset().aggregate(
+            item_count=Count('id'),
+            total_quantity=Coalesce(Sum('quantity'), 0),
+            subtotal=Coalesce(Sum(F('quantity') * F('product__price'), output_field=money), zero, output_field=money),
+            total=Coalesce(Sum(F('quantity') * F('product__effective_price'), output_field=money), zero, output_field=money),
+        )
+        summary['discount'] = summary['subtotal'] - summary['total']
+        for key in ('subtotal', 'total', 'discount'):
+            summary[key] = str(Decimal(summary[key]).quantize(Decimal('0.01')))
+        return {
+            'items': CartLineSerializer(items, many=True).data,
+            'summary': summary,
+        }
+
+
+class AutocompleteView(generics.GenericAPIView):
+    """Qidiruv maydoni uchun mahsulot va kategoriya nomlari bo'yicha prefiks takliflari"""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', settings.AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            return Response({"detail": "limit butun son bo‘lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': autocomplete.get_index().complete(query, max(limit, 1))})
+
+
+class CacheMetricsView(generics.GenericAPIView):
+    """Katalog javob keshi (endpointlar bo'yicha hit/miss) va avtoto'ldirish indeksi statistikasi"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'response_cache': response_cache.metrics(),
+            'autocomplete': autocomplete.get_index().stats(),
+        })